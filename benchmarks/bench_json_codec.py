@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Compare the JSON backends of ``claude_code_action.json_codec``.
+
+Each workload mirrors a hot path, on synthetic data of realistic shape:
+
+- event_payload: ``parse_github_context()`` loading a large pull request
+  event (long body, hundreds of labels, reviewers and commits)
+- api_pages: ``RestClient`` decoding 50 pages of 100 issue comments
+- stream_lines: ``run_claude()`` decoding 20k stream-json lines and
+  re-encoding them for the execution log
+- pretty_render: the pretty log format indenting 2k events
+
+Reported per backend: best time of ``--repeat`` runs, throughput over the
+JSON bytes processed, and the speedup over the stdlib. Usage:
+
+    python benchmarks/bench_json_codec.py
+    python benchmarks/bench_json_codec.py -w stream_lines --repeat 10
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from claude_code_action import json_codec  # noqa: E402
+
+DEFAULT_REPEAT = 5
+
+
+def user(index: int) -> Dict[str, Any]:
+    login = f"user-{index}"
+    return {
+        "login": login,
+        "id": 1000 + index,
+        "node_id": f"MDQ6VXNlcj{index:08d}",
+        "avatar_url": f"https://avatars.githubusercontent.com/u/{1000 + index}?v=4",
+        "url": f"https://api.github.com/users/{login}",
+        "html_url": f"https://github.com/{login}",
+        "type": "User",
+        "site_admin": False,
+    }
+
+
+def event_payload() -> bytes:
+    """A pull_request event of over 1 MB."""
+    body = "\n".join(f"- Line {i} of a long description with `code` and ünïcödé" for i in range(5000))
+    pull_request = {
+        "number": 4242,
+        "title": "Refactor the widget pipeline",
+        "body": body,
+        "user": user(0),
+        "labels": [{"id": i, "name": f"label-{i}", "color": "ededed", "description": "x" * 40} for i in range(300)],
+        "requested_reviewers": [user(i) for i in range(200)],
+        "commits": [
+            {"sha": f"{i:040x}", "message": f"Commit {i}\n\n" + "detail " * 30, "author": user(i % 50)}
+            for i in range(1500)
+        ],
+        "head": {"ref": "feature", "sha": "f" * 40, "repo": {"full_name": "owner/repo", "private": False}},
+        "base": {"ref": "main", "sha": "0" * 40, "repo": {"full_name": "owner/repo", "private": False}},
+    }
+    return json.dumps({"action": "opened", "pull_request": pull_request, "sender": user(0)}).encode()
+
+
+def api_pages() -> List[bytes]:
+    """50 pages of 100 issue comments each."""
+    pages = []
+    for page in range(50):
+        pages.append(json.dumps([
+            {
+                "id": page * 100 + i,
+                "user": user(i % 30),
+                "body": f"Comment {i}: " + "lorem ipsum dolor sit amet " * 20,
+                "created_at": "2024-01-01T00:00:00Z",
+                "reactions": {"total_count": i % 5, "+1": i % 3, "heart": 0},
+            }
+            for i in range(100)
+        ]).encode())
+    return pages
+
+
+def stream_lines(count: int = 20000) -> List[str]:
+    """Alternating assistant tool calls and tool results, as the CLI prints them."""
+    lines = []
+    for i in range(count // 2):
+        lines.append(json.dumps({
+            "type": "assistant",
+            "session_id": "00000000-0000-4000-8000-000000000000",
+            "message": {"content": [
+                {"type": "text", "text": f"Step {i}: reading the next file"},
+                {"type": "tool_use", "id": f"toolu_{i}", "name": "Read", "input": {"file_path": f"/src/file_{i}.py"}},
+            ]},
+        }))
+        lines.append(json.dumps({
+            "type": "user",
+            "message": {"content": [
+                {"type": "tool_result", "tool_use_id": f"toolu_{i}", "content": "def f():\n    return 1\n" * 40},
+            ]},
+        }))
+    return lines
+
+
+def workloads() -> Dict[str, Tuple[Callable[[Any], None], int]]:
+    """Map each workload to a function of the codec and the bytes it processes."""
+    payload = event_payload()
+    pages = api_pages()
+    lines = stream_lines()
+    events = [json.loads(line) for line in lines[:2000]]
+
+    def decode_event(codec: Any) -> None:
+        codec.loads(payload)
+
+    def decode_pages(codec: Any) -> None:
+        for page in pages:
+            codec.loads(page)
+
+    def round_trip_lines(codec: Any) -> None:
+        for line in lines:
+            codec.dumps(codec.loads(line))
+
+    def render_pretty(codec: Any) -> None:
+        for event in events:
+            codec.dumps(event, indent=True)
+
+    return {
+        "event_payload": (decode_event, len(payload)),
+        "api_pages": (decode_pages, sum(len(page) for page in pages)),
+        "stream_lines": (round_trip_lines, 2 * sum(len(line) for line in lines)),
+        "pretty_render": (render_pretty, sum(len(line) for line in lines[:2000])),
+    }
+
+
+def best_time(work: Callable[[Any], None], codec: Any, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work(codec)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-w", "--workload", action="append", help="workload to run (repeatable)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per workload; the best is kept")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    available = workloads()
+    selected = args.workload or list(available)
+    for name in selected:
+        if name not in available:
+            parser.error(f"unknown workload {name}; choose from {', '.join(available)}")
+
+    codecs = [json_codec.get_codec("json")]
+    if json_codec.orjson is not None:
+        codecs.append(json_codec.get_codec("orjson"))
+    else:
+        print("orjson is not installed; measuring the stdlib backend only\n")
+
+    results: Dict[str, Any] = {}
+    print(f"{'workload':<14} {'backend':<8} {'MB':>6} {'best s':>8} {'MB/s':>8} {'speedup':>8}")
+    for name in selected:
+        work, size = available[name]
+        results[name] = {}
+        stdlib_seconds = None
+        for codec in codecs:
+            seconds = best_time(work, codec, args.repeat)
+            stdlib_seconds = stdlib_seconds or seconds
+            results[name][codec.name] = {
+                "seconds": round(seconds, 4),
+                "throughput_mb_s": round(size / 1e6 / seconds, 1),
+                "speedup": round(stdlib_seconds / seconds, 2),
+            }
+            print(
+                f"{name:<14} {codec.name:<8} {size / 1e6:>6.1f} {seconds:>8.4f} "
+                f"{size / 1e6 / seconds:>8.1f} {stdlib_seconds / seconds:>7.2f}x"
+            )
+
+    print(f"\nSelected at runtime: {json_codec.BACKEND}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Benchmark the prepare step end to end against a local GitHub stand-in.
+
+Each scenario replays a recorded event payload from ``benchmarks/events``
+through ``entrypoints/prepare.py`` with ``github_stub.py`` answering the
+token exchange and every REST and GraphQL request, with the scenario's
+latency, rate limit and error injection. A scenario runs twice, each time
+in a fresh Python process:
+
+- cold: empty GitHub API response cache
+- warm: the cache left by the cold run, so unchanged GETs come back as 304
+
+Reported per run:
+
+- wall_seconds: latency of prepare's run()
+- process_seconds: the same plus interpreter start-up and imports
+- requests: requests the stand-in received (and how many were 304s or
+  errors/rate limited)
+- peak_rss_mb: peak resident memory of the prepare process
+
+Results are compared with ``prepare_baselines.json``; a run regresses when
+it is slower, uses more memory or sends more requests than its baseline
+beyond the tolerance. Usage:
+
+    python benchmarks/bench_prepare.py                  # run and compare
+    python benchmarks/bench_prepare.py -s flaky         # one scenario
+    python benchmarks/bench_prepare.py --update-baselines
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from github_stub import GitHubStub, StubConfig, start_stub
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARKS_DIR.parent
+EVENTS_DIR = BENCHMARKS_DIR / "events"
+BASELINES_FILE = BENCHMARKS_DIR / "prepare_baselines.json"
+
+DEFAULT_TOLERANCE = 0.3
+# Absolute slack so sub-second runs don't flag scheduler noise
+MIN_SLACK = {"wall_seconds": 0.1, "peak_rss_mb": 3.0}
+
+REPOSITORY = "octo-org/widgets"
+ACTOR = "mona"
+
+# event: file in events/ (without .json); stub: StubConfig settings
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "issue_comment": {
+        "description": "@claude comment on an issue, 20 ms API latency",
+        "event": "issue_comment_issue",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 20, "jitter_ms": 10},
+    },
+    "pr_comment": {
+        "description": "@claude comment on a pull request",
+        "event": "issue_comment_pr",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 20, "jitter_ms": 10},
+    },
+    "review_comment": {
+        "description": "@claude in a pull request review comment",
+        "event": "pull_request_review_comment",
+        "event_name": "pull_request_review_comment",
+        "stub": {"latency_ms": 20, "jitter_ms": 10},
+    },
+    "issue_opened": {
+        "description": "Issue opened with the trigger phrase in its body",
+        "event": "issues_opened",
+        "event_name": "issues",
+        "stub": {"latency_ms": 20, "jitter_ms": 10},
+    },
+    "high_latency": {
+        "description": "150-250 ms per API request",
+        "event": "issue_comment_issue",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 150, "jitter_ms": 100},
+    },
+    "flaky": {
+        "description": "30% of GETs fail with 502",
+        "event": "issue_comment_issue",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 20, "error_rate": 0.3, "seed": 7},
+    },
+    "rate_limited": {
+        "description": "3 requests left in the primary quota, reset in 2 s",
+        "event": "issue_comment_issue",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 20, "rate_limit_remaining": 3, "rate_limit_reset_seconds": 2},
+    },
+    "secondary_limit": {
+        "description": "Every 4th request hits a secondary rate limit",
+        "event": "issue_comment_issue",
+        "event_name": "issue_comment",
+        "stub": {"latency_ms": 20, "secondary_limit_every": 4},
+    },
+}
+
+PHASES = ("cold", "warm")
+
+# Seeds the retry backoff jitter of the client, so a scenario with injected
+# errors sleeps the same amount on every run
+RETRY_JITTER_SEED = 1
+
+
+def measure_in_process(result_file: str) -> None:
+    """Run prepare in this process and write its measurements."""
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+    from claude_code_action.entrypoints import prepare
+
+    random.seed(RETRY_JITTER_SEED)
+    exit_code = 0
+    start = time.perf_counter()
+    try:
+        asyncio.run(prepare.run())
+    except SystemExit as error:
+        exit_code = error.code if isinstance(error.code, int) else 1
+    wall = time.perf_counter() - start
+
+    with open(os.environ["GITHUB_OUTPUT"]) as f:
+        outputs = f.read()
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(result_file, "w") as f:
+        json.dump({
+            "exit_code": exit_code,
+            "triggered": "contains_trigger=true" in outputs,
+            "wall_seconds": round(wall, 3),
+            "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+        }, f)
+
+
+def child_environment(scenario: str, base_url: str, work_dir: str, run_dir: str) -> Dict[str, str]:
+    config = SCENARIOS[scenario]
+    env = {
+        name: value for name, value in os.environ.items()
+        if not name.startswith(("GITHUB_", "CLAUDE_GITHUB_", "INPUT_", "ACTIONS_", "RUNNER_"))
+        and name not in ("OVERRIDE_GITHUB_TOKEN", "DIRECT_PROMPT", "MCP_CONFIG")
+    }
+    env.update({
+        "GITHUB_API_URL": base_url,
+        "GITHUB_GRAPHQL_URL": f"{base_url}/graphql",
+        "ACTIONS_ID_TOKEN_REQUEST_URL": f"{base_url}/_oidc/token",
+        "ACTIONS_ID_TOKEN_REQUEST_TOKEN": "runtime-token",
+        "GITHUB_INSTALLATION_ID": "1",
+        "GITHUB_EVENT_PATH": str(EVENTS_DIR / f"{config['event']}.json"),
+        "GITHUB_EVENT_NAME": config["event_name"],
+        "GITHUB_REPOSITORY": REPOSITORY,
+        "GITHUB_ACTOR": ACTOR,
+        "GITHUB_RUN_ID": "1",
+        "TRIGGER_PHRASE": "@claude",
+        "RUNNER_TEMP": run_dir,
+        "GITHUB_OUTPUT": os.path.join(run_dir, "output"),
+        "GITHUB_ENV": os.path.join(run_dir, "env"),
+        # Shared by the cold and warm run
+        "CLAUDE_GITHUB_API_CACHE_DIR": os.path.join(work_dir, "api-cache"),
+    })
+    return env
+
+
+async def run_phase(stub: GitHubStub, base_url: str, scenario: str, work_dir: str, phase: str) -> Dict[str, Any]:
+    """Run prepare once in a child process and collect its and the stand-in's numbers."""
+    run_dir = os.path.join(work_dir, phase)
+    os.mkdir(run_dir)
+    for name in ("output", "env"):
+        Path(run_dir, name).touch()
+    stub.reset(StubConfig(**SCENARIOS[scenario]["stub"]))
+
+    result_file = os.path.join(run_dir, "result.json")
+    log_file = os.path.join(run_dir, "prepare.log")
+    start = time.perf_counter()
+    with open(log_file, "wb") as log:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, __file__, "--child", "--result-file", result_file,
+            env=child_environment(scenario, base_url, work_dir, run_dir),
+            stdout=log,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+        await process.wait()
+    process_seconds = time.perf_counter() - start
+
+    if not os.path.exists(result_file):
+        raise RuntimeError(f"{scenario} ({phase}) crashed:\n{Path(log_file).read_text()[-2000:]}")
+    with open(result_file) as f:
+        measured = json.load(f)
+    if measured["exit_code"] != 0 or not measured["triggered"]:
+        raise RuntimeError(f"{scenario} ({phase}) failed:\n{Path(log_file).read_text()[-2000:]}")
+
+    stats = stub.stats.to_dict()
+    statuses = stats["by_status"]
+    measured.update({
+        "process_seconds": round(process_seconds, 3),
+        "requests": stats["requests"],
+        "not_modified": statuses.get("304", 0),
+        "failed": sum(count for status, count in statuses.items() if int(status) >= 400),
+        "by_endpoint": stats["by_endpoint"],
+    })
+    return measured
+
+
+def compare(name: str, measured: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the regressions of ``measured`` against ``baseline``."""
+    regressions = []
+    for metric, unit in (("wall_seconds", "s"), ("peak_rss_mb", " MB")):
+        if measured[metric] > max(baseline[metric] * (1 + tolerance), baseline[metric] + MIN_SLACK[metric]):
+            regressions.append(f"{name}: {metric} {measured[metric]}{unit} > baseline {baseline[metric]}{unit}")
+    if measured["requests"] > baseline["requests"]:
+        regressions.append(f"{name}: {measured['requests']} requests > baseline {baseline['requests']}")
+    return regressions
+
+
+async def run_benchmarks(
+    scenarios: List[str],
+    baselines: Dict[str, Any],
+    tolerance: float,
+    regressions: List[str],
+) -> Dict[str, Any]:
+    """Run the scenarios against one stand-in, printing a row per run."""
+    stub = GitHubStub()
+    runner, base_url = await start_stub(stub)
+    results: Dict[str, Any] = {}
+    try:
+        for scenario in scenarios:
+            with tempfile.TemporaryDirectory(prefix="prepare-bench-") as work_dir:
+                for phase in PHASES:
+                    name = f"{scenario}/{phase}"
+                    measured = results[name] = await run_phase(stub, base_url, scenario, work_dir, phase)
+
+                    status = "-"
+                    if name in baselines:
+                        found = compare(name, measured, baselines[name], tolerance)
+                        regressions.extend(found)
+                        status = "REGRESSED" if found else "ok"
+                    print(
+                        f"{name:<24} {measured['wall_seconds']:>8} {measured['process_seconds']:>9} "
+                        f"{measured['requests']:>5} {measured['not_modified']:>5} {measured['failed']:>6} "
+                        f"{measured['peak_rss_mb']:>8}  {status}"
+                    )
+    finally:
+        await runner.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression")
+    parser.add_argument("--update-baselines", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_in_process(args.result_file)
+        return
+
+    baselines: Dict[str, Any] = {}
+    if BASELINES_FILE.exists():
+        baselines = json.loads(BASELINES_FILE.read_text())
+
+    regressions: List[str] = []
+    print(f"{'run':<24} {'wall s':>8} {'process s':>9} {'reqs':>5} {'304s':>5} {'failed':>6} {'peak MB':>8}  baseline")
+    results = asyncio.run(run_benchmarks(
+        args.scenario or list(SCENARIOS),
+        {} if args.update_baselines else baselines,
+        args.tolerance,
+        regressions,
+    ))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baselines:
+        baselines.update({
+            name: {key: value for key, value in measured.items() if key != "by_endpoint"}
+            for name, measured in results.items()
+        })
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines saved to {BASELINES_FILE}")
+        return
+
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
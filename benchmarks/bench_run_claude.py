@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark the output handling of run_claude against a fake ``claude``.
+
+Each scenario runs ``execute_claude()`` in a fresh Python process with
+``benchmarks/fake_claude.py`` on PATH as ``claude``, so no model tokens
+are spent. Reported per scenario:
+
+- wall_seconds: end-to-end latency of execute_claude()
+- throughput_mb_s: stdout bytes produced by the fake divided by wall time
+- events_per_s: stream-json events handled per second
+- peak_rss_mb: peak resident memory of the process running execute_claude()
+
+Results are compared with ``baselines.json``; a scenario regresses when
+it is slower or uses more memory than its baseline by more than the
+tolerance. Usage:
+
+    python benchmarks/bench_run_claude.py                 # run and compare
+    python benchmarks/bench_run_claude.py -s volume       # one scenario
+    python benchmarks/bench_run_claude.py --update-baselines
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARKS_DIR.parent
+FAKE_CLAUDE = BENCHMARKS_DIR / "fake_claude.py"
+BASELINES_FILE = BENCHMARKS_DIR / "baselines.json"
+
+DEFAULT_TOLERANCE = 0.3
+# Absolute slack so sub-second scenarios don't flag scheduler noise
+MIN_SLACK = {"wall_seconds": 0.05, "peak_rss_mb": 2.0}
+
+# fake: FAKE_CLAUDE_* settings (without prefix); options: run_claude options
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "small": {
+        "description": "Typical short run",
+        "fake": {"EVENTS": 200, "EVENT_BYTES": 1024},
+        "options": {},
+    },
+    "volume": {
+        "description": "Long run, ~40 MB of stream-json, pretty log",
+        "fake": {"EVENTS": 20000, "EVENT_BYTES": 2048},
+        "options": {},
+    },
+    "volume_raw": {
+        "description": "Same volume with the raw log format",
+        "fake": {"EVENTS": 20000, "EVENT_BYTES": 2048},
+        "options": {"log_format": "raw"},
+    },
+    "large_events": {
+        "description": "Few very long lines (1 MB tool results)",
+        "fake": {"EVENTS": 100, "EVENT_BYTES": 1024 * 1024},
+        "options": {"log_format": "compact"},
+    },
+    "stderr_noise": {
+        "description": "Moderate stdout with 100k lines of stderr",
+        "fake": {"EVENTS": 5000, "EVENT_BYTES": 512, "STDERR_LINES": 100000},
+        "options": {},
+    },
+    "paced": {
+        "description": "Events trickling in at 1000 pairs/s",
+        "fake": {"EVENTS": 2000, "EVENT_BYTES": 512, "RATE": 1000},
+        "options": {"log_format": "compact"},
+    },
+    "slow_exit": {
+        "description": "CLI lingers 2s after its result event",
+        "fake": {"EVENTS": 100, "EXIT_DELAY": 2},
+        "options": {},
+    },
+    "lingering_child": {
+        "description": "A leftover child keeps stdout open for 30s",
+        "fake": {"EVENTS": 100, "LINGER": 30},
+        "options": {"timeout_grace_seconds": "1"},
+    },
+}
+
+
+def measure_in_process(scenario: str, work_dir: str) -> Dict[str, Any]:
+    """Run one scenario in this process and return its measurements."""
+    sys.path.insert(0, str(REPO_ROOT / "src"))
+    from claude_code_action.base_action.run_claude import execute_claude
+
+    config = SCENARIOS[scenario]
+    prompt_path = os.path.join(work_dir, "prompt.txt")
+    with open(prompt_path, "w") as f:
+        f.write("Benchmark prompt\n")
+
+    options: Dict[str, Any] = {"progress_updates": "false"}
+    options.update(config["options"])
+
+    start = time.perf_counter()
+    result = asyncio.run(
+        execute_claude(prompt_path, options, output_dir=work_dir, progress_comment=False)
+    )
+    wall = time.perf_counter() - start
+
+    stdout_bytes = os.path.getsize(result.execution_file)
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "exit_code": result.exit_code,
+        "events": result.events,
+        "stdout_mb": round(stdout_bytes / 1e6, 2),
+        "wall_seconds": round(wall, 3),
+        "throughput_mb_s": round(stdout_bytes / 1e6 / wall, 2),
+        "events_per_s": round(result.events / wall, 1),
+        "peak_rss_mb": round(peak_rss_kb / 1024, 1),
+    }
+
+
+def run_scenario(scenario: str) -> Dict[str, Any]:
+    """Run one scenario in a child process with the fake CLI on PATH."""
+    with tempfile.TemporaryDirectory(prefix="claude-bench-") as work_dir:
+        bin_dir = os.path.join(work_dir, "bin")
+        os.mkdir(bin_dir)
+        os.symlink(FAKE_CLAUDE, os.path.join(bin_dir, "claude"))
+
+        env = os.environ.copy()
+        env["PATH"] = bin_dir + os.pathsep + env.get("PATH", "")
+        env["RUNNER_TEMP"] = work_dir
+        for name in ("GITHUB_OUTPUT", "GITHUB_STEP_SUMMARY", "CLAUDE_COMMENT_ID", "INPUT_TIMEOUT_MINUTES"):
+            env.pop(name, None)
+        for key, value in SCENARIOS[scenario]["fake"].items():
+            env[f"FAKE_CLAUDE_{key}"] = str(value)
+
+        result_file = os.path.join(work_dir, "result.json")
+        # The console output of run_claude is part of the measured work, but
+        # is discarded rather than printed
+        subprocess.run(
+            [sys.executable, __file__, "--child", scenario, "--work-dir", work_dir, "--result-file", result_file],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        with open(result_file) as f:
+            return json.load(f)
+
+
+def compare(scenario: str, measured: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return the regressions of ``measured`` against ``baseline``."""
+    regressions = []
+    if measured["throughput_mb_s"] < baseline["throughput_mb_s"] * (1 - tolerance):
+        regressions.append(
+            f"{scenario}: throughput {measured['throughput_mb_s']} MB/s < baseline {baseline['throughput_mb_s']} MB/s"
+        )
+    for metric, unit in (("wall_seconds", "s"), ("peak_rss_mb", " MB")):
+        if measured[metric] > max(baseline[metric] * (1 + tolerance), baseline[metric] + MIN_SLACK[metric]):
+            regressions.append(f"{scenario}: {metric} {measured[metric]}{unit} > baseline {baseline[metric]}{unit}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression")
+    parser.add_argument("--update-baselines", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measured = measure_in_process(args.child, args.work_dir)
+        with open(args.result_file, "w") as f:
+            json.dump(measured, f)
+        return
+
+    baselines: Dict[str, Any] = {}
+    if BASELINES_FILE.exists():
+        baselines = json.loads(BASELINES_FILE.read_text())
+
+    results: Dict[str, Any] = {}
+    regressions: List[str] = []
+    print(f"{'scenario':<16} {'wall s':>8} {'MB/s':>8} {'events/s':>10} {'peak MB':>8}  baseline")
+    for scenario in args.scenario or list(SCENARIOS):
+        measured = run_scenario(scenario)
+        results[scenario] = measured
+
+        baseline = baselines.get(scenario)
+        status = "-"
+        if baseline and not args.update_baselines:
+            found = compare(scenario, measured, baseline, args.tolerance)
+            regressions.extend(found)
+            status = "REGRESSED" if found else "ok"
+        print(
+            f"{scenario:<16} {measured['wall_seconds']:>8} {measured['throughput_mb_s']:>8} "
+            f"{measured['events_per_s']:>10} {measured['peak_rss_mb']:>8}  {status}"
+        )
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baselines:
+        baselines.update(results)
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Baselines saved to {BASELINES_FILE}")
+        return
+
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the ``claude`` CLI that emits synthetic stream-json.
+
+Configured through environment variables:
+
+- FAKE_CLAUDE_EVENTS: number of assistant/user event pairs (default 100)
+- FAKE_CLAUDE_EVENT_BYTES: size of each tool result payload (default 1024)
+- FAKE_CLAUDE_RATE: event pairs per second, 0 for as fast as possible (default 0)
+- FAKE_CLAUDE_STDERR_LINES: lines of stderr noise spread over the run (default 0)
+- FAKE_CLAUDE_EXIT_DELAY: seconds to wait after the result event (default 0)
+- FAKE_CLAUDE_LINGER: seconds a background child keeps stdout open after exit (default 0)
+- FAKE_CLAUDE_EXIT_CODE: exit status (default 0)
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def env_number(name: str, default: float) -> float:
+    return float(os.environ.get(name) or default)
+
+
+def main() -> None:
+    events = int(env_number("FAKE_CLAUDE_EVENTS", 100))
+    event_bytes = int(env_number("FAKE_CLAUDE_EVENT_BYTES", 1024))
+    rate = env_number("FAKE_CLAUDE_RATE", 0)
+    stderr_lines = int(env_number("FAKE_CLAUDE_STDERR_LINES", 0))
+    exit_delay = env_number("FAKE_CLAUDE_EXIT_DELAY", 0)
+    linger = env_number("FAKE_CLAUDE_LINGER", 0)
+    exit_code = int(env_number("FAKE_CLAUDE_EXIT_CODE", 0))
+
+    out = sys.stdout.buffer
+    err = sys.stderr.buffer
+    session_id = "00000000-0000-4000-8000-000000000000"
+    tools = ["Bash", "Read", "Edit", "Glob", "Grep", "mcp__github_file_ops__update_claude_comment"]
+
+    def emit(event: dict) -> None:
+        out.write(json.dumps(event).encode() + b"\n")
+
+    emit({
+        "type": "system",
+        "subtype": "init",
+        "session_id": session_id,
+        "model": "claude-sonnet-4-20250514",
+        "tools": tools,
+    })
+
+    # Word-like filler so JSON encoding and rendering see realistic text
+    words = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod ".split()
+    filler = " ".join(words[i % len(words)] for i in range(event_bytes // 6 + 1))[:event_bytes]
+    stderr_every = max(1, events // stderr_lines) if stderr_lines else 0
+    stderr_per_event = max(1, stderr_lines // events) if stderr_lines and events else 0
+    start = time.monotonic()
+
+    for i in range(events):
+        tool = tools[i % (len(tools) - 1)]
+        emit({
+            "type": "assistant",
+            "message": {
+                "id": f"msg_{i:08d}",
+                "model": "claude-sonnet-4-20250514",
+                "content": [
+                    {"type": "text", "text": f"Step {i}: running {tool}"},
+                    {"type": "tool_use", "id": f"toolu_{i:08d}", "name": tool, "input": {"command": f"echo {i}"}},
+                ],
+                "usage": {
+                    "input_tokens": 1200,
+                    "output_tokens": 80,
+                    "cache_read_input_tokens": 900,
+                    "cache_creation_input_tokens": 50,
+                },
+            },
+            "session_id": session_id,
+        })
+        emit({
+            "type": "user",
+            "message": {
+                "role": "user",
+                "content": [{"type": "tool_result", "tool_use_id": f"toolu_{i:08d}", "content": filler}],
+            },
+            "session_id": session_id,
+        })
+
+        if stderr_every and i % stderr_every == 0:
+            for _ in range(stderr_per_event):
+                err.write(b"[DEBUG] synthetic stderr noise from the benchmark stand-in\n")
+
+        if rate:
+            out.flush()
+            delay = start + (i + 1) / rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    emit({
+        "type": "result",
+        "subtype": "success" if exit_code == 0 else "error_during_execution",
+        "is_error": exit_code != 0,
+        "num_turns": events,
+        "duration_ms": int((time.monotonic() - start) * 1000),
+        "duration_api_ms": int((time.monotonic() - start) * 1000),
+        "total_cost_usd": round(events * 0.0042, 6),
+        "result": "Benchmark run finished.",
+        "session_id": session_id,
+        "usage": {
+            "input_tokens": 1200 * events,
+            "output_tokens": 80 * events,
+            "cache_read_input_tokens": 900 * events,
+            "cache_creation_input_tokens": 50 * events,
+        },
+    })
+    out.flush()
+    err.flush()
+
+    if linger and os.fork() == 0:
+        # A leftover child that still holds stdout and stderr open
+        time.sleep(linger)
+        os._exit(0)
+
+    if exit_delay:
+        time.sleep(exit_delay)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
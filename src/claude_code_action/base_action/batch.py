@@ -0,0 +1,192 @@
+"""Run many prompts concurrently under a parallelism limit."""
+
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .run_claude import execute_claude
+
+DEFAULT_BATCH_PARALLELISM = 4
+
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one prompt in a batch."""
+    name: str
+    prompt_file: str
+    output_dir: str
+    conclusion: str
+    exit_code: int
+    execution_file: Optional[str] = None
+    metrics_file: Optional[str] = None
+    error: Optional[str] = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class BatchSummary:
+    """Aggregate outcome of a batch."""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    parallelism: int = DEFAULT_BATCH_PARALLELISM
+    wall_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    items: List[BatchItemResult] = field(default_factory=list)
+
+    @property
+    def conclusion(self) -> str:
+        return "success" if self.total and not self.failed else "failure"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the summary."""
+        data = asdict(self)
+        data["conclusion"] = self.conclusion
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+def discover_prompts(batch_input: str) -> List[Path]:
+    """
+    Resolve the prompt files of a batch.
+
+    ``batch_input`` is either a directory (every non-hidden file in it, in
+    name order) or a manifest file listing one prompt path per line, with
+    ``#`` comments and paths relative to the manifest.
+    """
+    source = Path(batch_input)
+    if not source.exists():
+        raise FileNotFoundError(f"Batch input '{batch_input}' does not exist.")
+
+    if source.is_dir():
+        prompts = sorted(
+            p for p in source.iterdir() if p.is_file() and not p.name.startswith(".")
+        )
+    else:
+        prompts = []
+        for line in source.read_text().splitlines():
+            entry = line.split("#", 1)[0].strip()
+            if not entry:
+                continue
+            path = Path(entry)
+            prompts.append(path if path.is_absolute() else source.parent / path)
+
+    for prompt in prompts:
+        if not prompt.is_file():
+            raise FileNotFoundError(f"Prompt file '{prompt}' does not exist.")
+        if prompt.stat().st_size == 0:
+            raise ValueError(f"Prompt file '{prompt}' is empty.")
+
+    if not prompts:
+        raise ValueError(f"Batch input '{batch_input}' contains no prompt files.")
+    return prompts
+
+
+def _safe_stem(prompt: Path) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", prompt.stem).strip("-") or "prompt"
+
+
+def _item_name(index: int, prompt: Path) -> str:
+    return f"{index:03d}-{_safe_stem(prompt)}"
+
+
+def _state_names(prompts: List[Path]) -> List[str]:
+    """
+    Name the saved-session directory of each prompt after its stem, so
+    adding or removing prompts doesn't orphan the sessions of the others.
+    """
+    names = []
+    seen: Dict[str, int] = {}
+    for prompt in prompts:
+        stem = _safe_stem(prompt)
+        seen[stem] = seen.get(stem, 0) + 1
+        names.append(stem if seen[stem] == 1 else f"{stem}-{seen[stem]}")
+    return names
+
+
+async def run_batch(
+    batch_input: str,
+    options: Dict[str, Optional[str]],
+    parallelism: int = DEFAULT_BATCH_PARALLELISM,
+    output_root: Optional[str] = None,
+) -> BatchSummary:
+    """Execute every prompt of a batch, at most ``parallelism`` at a time."""
+    if parallelism <= 0:
+        raise ValueError(f"batch_parallelism must be a positive number, got: {parallelism}")
+
+    prompts = discover_prompts(batch_input)
+    output_root = output_root or os.path.join(os.environ.get("RUNNER_TEMP", "/tmp"), "claude-batch")
+    summary = BatchSummary(total=len(prompts), parallelism=parallelism)
+    semaphore = asyncio.Semaphore(parallelism)
+
+    print(f"Running {len(prompts)} prompts with parallelism {parallelism}")
+
+    async def run_one(index: int, prompt: Path, state_name: str) -> BatchItemResult:
+        name = _item_name(index, prompt)
+        output_dir = os.path.join(output_root, name)
+        item_options = dict(options)
+        if item_options.get("stderr_file"):
+            item_options["stderr_file"] = os.path.join(output_dir, "claude-stderr.log")
+        if item_options.get("resume_state_dir"):
+            # Concurrent items must not share (or clear) each other's session
+            item_options["resume_state_dir"] = os.path.join(options["resume_state_dir"], state_name)
+
+        async with semaphore:
+            try:
+                Path(output_dir).mkdir(parents=True, exist_ok=True)
+                result = await execute_claude(
+                    str(prompt), item_options, output_dir=output_dir, label=name,
+                    progress_comment=False,
+                )
+            except Exception as e:
+                print(f"::error::Batch prompt {name} failed: {e}")
+                return BatchItemResult(
+                    name=name, prompt_file=str(prompt), output_dir=output_dir,
+                    conclusion="failure", exit_code=1, error=str(e),
+                )
+
+        outputs = result.outputs()
+        return BatchItemResult(
+            name=name,
+            prompt_file=str(prompt),
+            output_dir=output_dir,
+            conclusion=result.conclusion,
+            exit_code=result.exit_code,
+            execution_file=outputs.get("execution_file"),
+            metrics_file=result.metrics_file,
+            error=result.error,
+            outputs=outputs,
+        )
+
+    started = time.monotonic()
+    items = await asyncio.gather(*(
+        run_one(i, p, state_name)
+        for i, (p, state_name) in enumerate(zip(prompts, _state_names(prompts)), start=1)
+    ))
+    summary.wall_seconds = round(time.monotonic() - started, 3)
+
+    for item in items:
+        summary.items.append(item)
+        if item.conclusion == "success":
+            summary.succeeded += 1
+        else:
+            summary.failed += 1
+        summary.input_tokens += int(item.outputs.get("input_tokens") or 0)
+        summary.output_tokens += int(item.outputs.get("output_tokens") or 0)
+        summary.cost_usd += float(item.outputs.get("cost_usd") or 0)
+
+    return summary
+
+
+def write_batch_summary(summary: BatchSummary, path: str) -> None:
+    """Write the batch summary JSON to ``path``."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(summary.to_dict(), f, indent=2)
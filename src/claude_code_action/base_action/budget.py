@@ -0,0 +1,119 @@
+"""Token and cost budgets enforced while Claude runs."""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .metrics import ExecutionMetrics, TokenUsage
+
+# Exit code reported when a run is stopped for exceeding its budget
+BUDGET_EXCEEDED_EXIT_CODE = 125
+
+# USD per million tokens: (input, output). Cache writes cost 1.25x and cache
+# reads 0.1x the input price. Matched by substring of the model id.
+MODEL_PRICING = (
+    ("opus", (15.0, 75.0)),
+    ("haiku", (0.8, 4.0)),
+    ("sonnet", (3.0, 15.0)),
+)
+DEFAULT_PRICING = (3.0, 15.0)
+
+
+def model_pricing(model: Optional[str]) -> Tuple[float, float]:
+    """Return (input, output) USD per million tokens for a model id."""
+    model_id = (model or "").lower()
+    for family, pricing in MODEL_PRICING:
+        if family in model_id:
+            return pricing
+    return DEFAULT_PRICING
+
+
+def estimate_cost_usd(usage: TokenUsage, model: Optional[str]) -> float:
+    """Estimate spend from token counts, for use before the CLI reports cost."""
+    input_price, output_price = model_pricing(model)
+    return (
+        usage.input_tokens * input_price
+        + usage.cache_creation_input_tokens * input_price * 1.25
+        + usage.cache_read_input_tokens * input_price * 0.1
+        + usage.output_tokens * output_price
+    ) / 1_000_000
+
+
+@dataclass
+class BudgetLimits:
+    """Configured budgets; None means unlimited."""
+    max_input_tokens: Optional[int] = None
+    max_output_tokens: Optional[int] = None
+    max_cost_usd: Optional[float] = None
+
+    @classmethod
+    def parse(
+        cls,
+        max_input_tokens: Optional[str],
+        max_output_tokens: Optional[str],
+        max_cost_usd: Optional[str],
+    ) -> "BudgetLimits":
+        """Build limits from action inputs, validating that they are positive."""
+        limits = cls()
+        for name, raw, convert in (
+            ("max_input_tokens", max_input_tokens, int),
+            ("max_output_tokens", max_output_tokens, int),
+            ("max_cost_usd", max_cost_usd, float),
+        ):
+            if not raw:
+                continue
+            try:
+                value = convert(raw)
+                if value <= 0:
+                    raise ValueError()
+            except ValueError:
+                raise ValueError(f"{name} must be a positive number, got: {raw}")
+            setattr(limits, name, value)
+        return limits
+
+    @property
+    def enabled(self) -> bool:
+        return any(
+            limit is not None
+            for limit in (self.max_input_tokens, self.max_output_tokens, self.max_cost_usd)
+        )
+
+
+class BudgetGovernor:
+    """
+    Check running usage against the configured budgets.
+
+    Input tokens include cache reads and writes, since all of them are
+    billed. Cost uses the CLI-reported figure when available and otherwise
+    an estimate from the model's list price.
+    """
+
+    def __init__(self, limits: BudgetLimits, metrics: ExecutionMetrics):
+        self.limits = limits
+        self.metrics = metrics
+        self.exceeded: Optional[str] = None
+
+    def input_tokens(self) -> int:
+        usage = self.metrics.usage
+        return usage.input_tokens + usage.cache_creation_input_tokens + usage.cache_read_input_tokens
+
+    def cost_usd(self) -> float:
+        if self.metrics.cost_usd is not None:
+            return self.metrics.cost_usd
+        return estimate_cost_usd(self.metrics.usage, self.metrics.model)
+
+    def check(self) -> Optional[str]:
+        """Return why the budget is exhausted, or None while within budget."""
+        if self.exceeded is not None:
+            return self.exceeded
+
+        limits = self.limits
+        if limits.max_input_tokens is not None and self.input_tokens() > limits.max_input_tokens:
+            self.exceeded = f"input tokens {self.input_tokens()} > {limits.max_input_tokens}"
+        elif (
+            limits.max_output_tokens is not None
+            and self.metrics.usage.output_tokens > limits.max_output_tokens
+        ):
+            self.exceeded = f"output tokens {self.metrics.usage.output_tokens} > {limits.max_output_tokens}"
+        elif limits.max_cost_usd is not None and self.cost_usd() > limits.max_cost_usd:
+            self.exceeded = f"cost ${self.cost_usd():.4f} > ${limits.max_cost_usd:.4f}"
+        return self.exceeded
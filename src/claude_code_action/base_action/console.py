@@ -0,0 +1,180 @@
+"""Console rendering of the Claude stream-json output."""
+
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, TextIO
+
+from .. import json_codec
+
+LOG_FORMATS = ("raw", "compact", "pretty")
+DEFAULT_LOG_FORMAT = "pretty"
+
+# Longest text excerpt shown per event in compact mode
+COMPACT_TEXT_LIMIT = 120
+
+
+def _excerpt(text: str, limit: int = COMPACT_TEXT_LIMIT) -> str:
+    """Collapse whitespace and truncate text to a single short line."""
+    single_line = " ".join(text.split())
+    if len(single_line) > limit:
+        return single_line[: limit - 3] + "..."
+    return single_line
+
+
+class EventRenderer:
+    """
+    Render stream-json lines for the Actions log.
+
+    Modes:
+    - raw: the line exactly as emitted by the CLI
+    - compact: one short summary line per event (turn, tool, duration)
+    - pretty: the event re-encoded as indented JSON
+    """
+
+    def __init__(self, mode: str = DEFAULT_LOG_FORMAT):
+        if mode not in LOG_FORMATS:
+            raise ValueError(
+                f"log_format must be one of {', '.join(LOG_FORMATS)}, got: {mode}"
+            )
+        self.mode = mode
+        self.turn = 0
+        self._seen_messages: Set[str] = set()
+        self._tool_starts: Dict[str, float] = {}
+        self._tool_names: Dict[str, str] = {}
+
+    def render(self, line: str, event: Optional[Dict[str, Any]]) -> str:
+        """Return the text to log for one stdout line (including newline)."""
+        if event is None or self.mode == "raw":
+            return line if line.endswith("\n") else line + "\n"
+        if self.mode == "pretty":
+            return json_codec.dumps(event, indent=True) + "\n"
+        return "".join(f"{entry}\n" for entry in self._compact(event))
+
+    def _compact(self, event: Dict[str, Any]) -> List[str]:
+        event_type = event.get("type", "unknown")
+
+        if event_type == "system":
+            if event.get("subtype") == "init":
+                tools = event.get("tools") or []
+                return [
+                    f"[init] session {event.get('session_id', '?')} "
+                    f"model {event.get('model', '?')} ({len(tools)} tools)"
+                ]
+            return [f"[system] {event.get('subtype', '')}".rstrip()]
+
+        if event_type == "assistant":
+            message = event.get("message") or {}
+            # One event per content block, all sharing the message id
+            message_id = message.get("id")
+            if message_id is None or message_id not in self._seen_messages:
+                if message_id is not None:
+                    self._seen_messages.add(message_id)
+                self.turn += 1
+            entries = []
+            for block in message.get("content") or []:
+                block_type = block.get("type")
+                if block_type == "tool_use":
+                    tool_id = block.get("id", "")
+                    name = block.get("name", "?")
+                    self._tool_starts[tool_id] = time.monotonic()
+                    self._tool_names[tool_id] = name
+                    entries.append(f"[turn {self.turn}] tool_use {name}")
+                elif block_type == "text":
+                    entries.append(f"[turn {self.turn}] text: {_excerpt(block.get('text', ''))}")
+            return entries or [f"[turn {self.turn}] assistant"]
+
+        if event_type == "user":
+            entries = []
+            for block in (event.get("message") or {}).get("content") or []:
+                if not isinstance(block, dict) or block.get("type") != "tool_result":
+                    continue
+                tool_id = block.get("tool_use_id", "")
+                name = self._tool_names.pop(tool_id, "?")
+                started = self._tool_starts.pop(tool_id, None)
+                duration = f" {time.monotonic() - started:.1f}s" if started is not None else ""
+                status = " error" if block.get("is_error") else ""
+                entries.append(f"[turn {self.turn}] tool_result {name}{duration}{status}")
+            return entries or [f"[turn {self.turn}] user"]
+
+        if event_type == "result":
+            duration_s = (event.get("duration_ms") or 0) / 1000
+            cost = event.get("total_cost_usd", event.get("cost_usd"))
+            cost_text = f" cost=${cost:.4f}" if isinstance(cost, (int, float)) else ""
+            return [
+                f"[result] {event.get('subtype', '')} turns={event.get('num_turns', self.turn)} "
+                f"duration={duration_s:.1f}s{cost_text}"
+            ]
+
+        return [f"[{event_type}]"]
+
+
+class BufferedConsole:
+    """
+    Buffer log text and write it to the console from a background task.
+
+    ``write`` never blocks, so a slow log consumer cannot stall the reader
+    that drains the child's stdout.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        flush_bytes: int = 64 * 1024,
+        flush_interval: float = 0.25,
+        prefix: str = "",
+    ):
+        self.stream = stream or sys.stdout
+        self.prefix = prefix
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> "BufferedConsole":
+        """Start the background flush task."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def write(self, text: str) -> None:
+        """Queue text for output."""
+        if self.prefix:
+            text = "".join(self.prefix + line for line in text.splitlines(keepends=True))
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.flush_bytes:
+            self._wake.set()
+
+    def _write_sync(self, data: str) -> None:
+        self.stream.write(data)
+        self.stream.flush()
+
+    async def _flush(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        self._pending_size = 0
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_sync, data)
+
+    async def _run(self) -> None:
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def aclose(self) -> None:
+        """Stop the background task and write anything still buffered."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self._flush()
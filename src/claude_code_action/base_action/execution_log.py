@@ -0,0 +1,64 @@
+"""Streaming writer for the Claude execution log."""
+
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional
+
+from .. import json_codec
+
+
+class ExecutionLogWriter:
+    """
+    Append stream-json events to a JSON array file as they arrive.
+
+    The closing bracket is rewritten after every event, so the file on disk
+    is always a complete JSON array even if the run is killed mid-stream.
+    Memory use is independent of the size of the log.
+    """
+
+    _TRAILER = b"\n]\n"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file: Optional[BinaryIO] = None
+        self._tail = 0
+
+    def open(self) -> "ExecutionLogWriter":
+        """Create (or truncate) the execution file as an empty array."""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(b"[")
+        self._tail = self._file.tell()
+        self._file.write(self._TRAILER)
+        self._file.flush()
+        self.count = 0
+        return self
+
+    def write_raw(self, text: str) -> None:
+        """Append an already-serialized JSON value as the next array element."""
+        if self._file is None:
+            raise RuntimeError("Execution log is not open")
+
+        separator = b"\n  " if self.count == 0 else b",\n  "
+        self._file.seek(self._tail)
+        self._file.write(separator + text.strip().encode("utf-8"))
+        self._tail = self._file.tell()
+        self._file.write(self._TRAILER)
+        self._file.flush()
+        self.count += 1
+
+    def write_event(self, event: Dict[str, Any]) -> None:
+        """Serialize and append a parsed event."""
+        self.write_raw(json_codec.dumps(event))
+
+    def close(self) -> None:
+        """Close the underlying file; the array on disk is already complete."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ExecutionLogWriter":
+        return self.open()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
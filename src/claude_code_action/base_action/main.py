@@ -4,25 +4,26 @@ import os
 import sys
 from typing import Dict, Any
 
+from claude_code_action.base_action.batch import DEFAULT_BATCH_PARALLELISM, run_batch, write_batch_summary
 from claude_code_action.base_action.prepare_prompt import prepare_prompt
-from claude_code_action.base_action.run_claude import run_claude
+from claude_code_action.base_action.redact import install_redactor
+from claude_code_action.base_action.run_claude import run_claude, set_output
 from claude_code_action.base_action.setup_claude_code_settings import setup_claude_code_settings
 from claude_code_action.base_action.validate_env import validate_environment_variables
+from claude_code_action.github.api.metrics import write_api_metrics
+from claude_code_action.github.api.rate_limit import log_rate_limiter_stats
+from claude_code_action.github.api.session import close_shared_session
 
 
 async def run() -> None:
     """Main entry point for the base action."""
+    install_redactor()
     try:
         validate_environment_variables()
         
         await setup_claude_code_settings()
         
-        prompt_config = await prepare_prompt({
-            "prompt": os.environ.get("INPUT_PROMPT", ""),
-            "prompt_file": os.environ.get("INPUT_PROMPT_FILE", ""),
-        })
-        
-        await run_claude(prompt_config["path"], {
+        options = {
             "allowed_tools": os.environ.get("INPUT_ALLOWED_TOOLS"),
             "disallowed_tools": os.environ.get("INPUT_DISALLOWED_TOOLS"),
             "max_turns": os.environ.get("INPUT_MAX_TURNS"),
@@ -30,17 +31,58 @@ async def run() -> None:
             "system_prompt": os.environ.get("INPUT_SYSTEM_PROMPT"),
             "append_system_prompt": os.environ.get("INPUT_APPEND_SYSTEM_PROMPT"),
             "claude_env": os.environ.get("INPUT_CLAUDE_ENV"),
+            "stderr_buffer_kb": os.environ.get("INPUT_STDERR_BUFFER_KB"),
+            "stderr_file": os.environ.get("INPUT_STDERR_FILE"),
+            "log_format": os.environ.get("INPUT_LOG_FORMAT"),
+            "timeout_grace_seconds": os.environ.get("INPUT_TIMEOUT_GRACE_SECONDS"),
+            "resource_sample_interval": os.environ.get("INPUT_RESOURCE_SAMPLE_INTERVAL"),
+            "progress_updates": os.environ.get("INPUT_PROGRESS_UPDATES"),
+            "progress_update_interval": os.environ.get("INPUT_PROGRESS_UPDATE_INTERVAL"),
+            "result_cache_dir": os.environ.get("INPUT_RESULT_CACHE_DIR"),
+            "resume_state_dir": os.environ.get("INPUT_RESUME_STATE_DIR"),
+            "max_resume_attempts": os.environ.get("INPUT_MAX_RESUME_ATTEMPTS"),
+            "max_input_tokens": os.environ.get("INPUT_MAX_INPUT_TOKENS"),
+            "max_output_tokens": os.environ.get("INPUT_MAX_OUTPUT_TOKENS"),
+            "max_cost_usd": os.environ.get("INPUT_MAX_COST_USD"),
+            "provider_fallbacks": os.environ.get("INPUT_PROVIDER_FALLBACKS"),
+        }
+        
+        # Batch mode: run every prompt of a directory or manifest concurrently
+        if batch_input := os.environ.get("INPUT_BATCH_PROMPTS"):
+            parallelism = int(os.environ.get("INPUT_BATCH_PARALLELISM") or DEFAULT_BATCH_PARALLELISM)
+            summary = await run_batch(batch_input, options, parallelism)
+            
+            runner_temp = os.environ.get("RUNNER_TEMP", "/tmp")
+            summary_file = os.path.join(runner_temp, "claude-batch-summary.json")
+            write_batch_summary(summary, summary_file)
+            print(
+                f"Batch finished: {summary.succeeded}/{summary.total} succeeded "
+                f"in {summary.wall_seconds}s, summary saved to {summary_file}"
+            )
+            
+            set_output("batch_summary_file", summary_file)
+            set_output("batch_succeeded", str(summary.succeeded))
+            set_output("batch_failed", str(summary.failed))
+            set_output("conclusion", summary.conclusion)
+            if summary.failed:
+                sys.exit(1)
+            return
+        
+        prompt_config = await prepare_prompt({
+            "prompt": os.environ.get("INPUT_PROMPT", ""),
+            "prompt_file": os.environ.get("INPUT_PROMPT_FILE", ""),
         })
         
+        await run_claude(prompt_config["path"], options)
+        
     except Exception as error:
         print(f"::error::Action failed with error: {error}")
-        # Set GitHub Actions outputs for failure
-        if github_output := os.environ.get("GITHUB_OUTPUT"):
-            with open(github_output, "a") as f:
-                f.write(f"conclusion=failure\n")
-        else:
-            print(f"::set-output name=conclusion::failure")
+        set_output("conclusion", "failure")
         sys.exit(1)
+    finally:
+        log_rate_limiter_stats()
+        write_api_metrics("run-claude")
+        await close_shared_session()
 
 
 if __name__ == "__main__":
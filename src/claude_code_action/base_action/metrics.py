@@ -0,0 +1,185 @@
+"""Execution metrics extracted from the Claude stream-json output."""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+
+@dataclass
+class TokenUsage:
+    """Token counts reported by the model."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+    def add(self, usage: Dict[str, Any]) -> None:
+        """Accumulate a stream-json ``usage`` object."""
+        self.input_tokens += int(usage.get("input_tokens") or 0)
+        self.output_tokens += int(usage.get("output_tokens") or 0)
+        self.cache_creation_input_tokens += int(usage.get("cache_creation_input_tokens") or 0)
+        self.cache_read_input_tokens += int(usage.get("cache_read_input_tokens") or 0)
+
+    def replace(self, usage: Dict[str, Any]) -> None:
+        """Overwrite the counts present in an authoritative ``usage`` object."""
+        for name in asdict(self):
+            if usage.get(name) is not None:
+                setattr(self, name, int(usage[name]))
+
+
+@dataclass
+class ToolStats:
+    """Call count and wall-clock latency for one tool."""
+    calls: int = 0
+    errors: int = 0
+    completed: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float, is_error: bool) -> None:
+        """Record a finished tool call."""
+        self.completed += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if is_error:
+            self.errors += 1
+
+
+@dataclass
+class ExecutionMetrics:
+    """
+    Incrementally built summary of a Claude run.
+
+    Feed every parsed stream-json event to ``observe``. Assistant usage is
+    counted once per message id; the final ``result`` event, when present,
+    is authoritative for totals and cost.
+    """
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    cost_usd: Optional[float] = None
+    num_turns: int = 0
+    duration_ms: Optional[int] = None
+    duration_api_ms: Optional[int] = None
+    wall_seconds: float = 0.0
+    session_id: Optional[str] = None
+    model: Optional[str] = None
+    result_subtype: Optional[str] = None
+    is_error: Optional[bool] = None
+    event_count: int = 0
+    tools: Dict[str, ToolStats] = field(default_factory=dict)
+    _started: float = field(default_factory=time.monotonic, repr=False)
+    _seen_messages: Set[str] = field(default_factory=set, repr=False)
+    _pending_tools: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Update the metrics from one stream-json event."""
+        self.event_count += 1
+        event_type = event.get("type")
+
+        if event_type == "system" and event.get("subtype") == "init":
+            self.session_id = event.get("session_id", self.session_id)
+            self.model = event.get("model", self.model)
+        elif event_type == "assistant":
+            self._observe_assistant(event.get("message") or {})
+        elif event_type == "user":
+            self._observe_tool_results(event.get("message") or {})
+        elif event_type == "result":
+            self._observe_result(event)
+
+    def _observe_assistant(self, message: Dict[str, Any]) -> None:
+        message_id = message.get("id")
+        if message_id is None or message_id not in self._seen_messages:
+            if message_id is not None:
+                self._seen_messages.add(message_id)
+            self.num_turns += 1
+            if isinstance(message.get("usage"), dict):
+                self.usage.add(message["usage"])
+            if message.get("model"):
+                self.model = message["model"]
+
+        now = time.monotonic()
+        for block in message.get("content") or []:
+            if isinstance(block, dict) and block.get("type") == "tool_use":
+                name = block.get("name", "unknown")
+                self.tools.setdefault(name, ToolStats()).calls += 1
+                self._pending_tools[block.get("id", "")] = (name, now)
+
+    def _observe_tool_results(self, message: Dict[str, Any]) -> None:
+        content = message.get("content")
+        if not isinstance(content, list):
+            return
+        now = time.monotonic()
+        for block in content:
+            if not isinstance(block, dict) or block.get("type") != "tool_result":
+                continue
+            pending = self._pending_tools.pop(block.get("tool_use_id", ""), None)
+            if pending is None:
+                continue
+            name, started = pending
+            self.tools[name].record(now - started, bool(block.get("is_error")))
+
+    def _observe_result(self, event: Dict[str, Any]) -> None:
+        self.result_subtype = event.get("subtype")
+        self.is_error = event.get("is_error")
+        self.duration_ms = event.get("duration_ms", self.duration_ms)
+        self.duration_api_ms = event.get("duration_api_ms", self.duration_api_ms)
+        self.session_id = event.get("session_id", self.session_id)
+        if event.get("num_turns") is not None:
+            self.num_turns = int(event["num_turns"])
+
+        cost = event.get("total_cost_usd", event.get("cost_usd"))
+        if isinstance(cost, (int, float)):
+            self.cost_usd = float(cost)
+
+        if isinstance(event.get("usage"), dict):
+            self.usage.replace(event["usage"])
+
+    def finish(self) -> None:
+        """Stamp the wall-clock duration of the run."""
+        self.wall_seconds = round(time.monotonic() - self._started, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of the metrics."""
+        tools = {}
+        for name, stats in sorted(self.tools.items()):
+            tool = asdict(stats)
+            tool["total_seconds"] = round(stats.total_seconds, 3)
+            tool["max_seconds"] = round(stats.max_seconds, 3)
+            tool["mean_seconds"] = (
+                round(stats.total_seconds / stats.completed, 3) if stats.completed else None
+            )
+            tools[name] = tool
+
+        return {
+            "session_id": self.session_id,
+            "model": self.model,
+            "result": self.result_subtype,
+            "is_error": self.is_error,
+            "num_turns": self.num_turns,
+            "event_count": self.event_count,
+            "usage": asdict(self.usage),
+            "cost_usd": self.cost_usd,
+            "duration_ms": self.duration_ms,
+            "duration_api_ms": self.duration_api_ms,
+            "wall_seconds": self.wall_seconds,
+            "tools": tools,
+        }
+
+    def headline_outputs(self) -> Dict[str, str]:
+        """Return the values exposed as GitHub Actions step outputs."""
+        return {
+            "input_tokens": str(self.usage.input_tokens),
+            "output_tokens": str(self.usage.output_tokens),
+            "cache_read_input_tokens": str(self.usage.cache_read_input_tokens),
+            "cache_creation_input_tokens": str(self.usage.cache_creation_input_tokens),
+            "cost_usd": "" if self.cost_usd is None else f"{self.cost_usd:.6f}",
+            "num_turns": str(self.num_turns),
+            "duration_ms": str(self.duration_ms if self.duration_ms is not None else int(self.wall_seconds * 1000)),
+        }
+
+    def write(self, path: str) -> None:
+        """Write the metrics JSON to ``path``."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
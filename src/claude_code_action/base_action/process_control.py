@@ -0,0 +1,159 @@
+"""Process-group management for the Claude subprocess tree."""
+
+import asyncio
+import os
+import signal
+import sys
+from typing import Any, Callable, Dict, List
+
+DEFAULT_TIMEOUT_GRACE_SECONDS = 5.0
+GROUP_POLL_INTERVAL = 0.1
+
+_USE_PROCESS_GROUPS = sys.platform != "win32"
+
+TERMINATION_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+_termination_callbacks: List[Callable[[int], None]] = []
+
+
+def process_group_kwargs() -> Dict[str, Any]:
+    """Extra subprocess arguments that start the child in its own process group."""
+    if _USE_PROCESS_GROUPS:
+        return {"start_new_session": True}
+    return {}
+
+
+def _dispatch_termination_signal(signum: int) -> None:
+    for callback in list(_termination_callbacks):
+        callback(signum)
+
+
+def on_termination_signal(callback: Callable[[int], None]) -> Callable[[], None]:
+    """
+    Call ``callback`` with the signal number on SIGTERM or SIGINT.
+
+    A child started with ``process_group_kwargs()`` is in its own session,
+    so the signals the runner sends when the job is cancelled don't reach
+    it; callers use this to stop the child's tree themselves. Concurrent
+    runs (batch mode) each register their own callback. Returns a function
+    that unregisters it, restoring the default handlers after the last one.
+    """
+    if not _USE_PROCESS_GROUPS:
+        return lambda: None
+    loop = asyncio.get_running_loop()
+    if not _termination_callbacks:
+        for sig in TERMINATION_SIGNALS:
+            loop.add_signal_handler(sig, _dispatch_termination_signal, sig)
+    _termination_callbacks.append(callback)
+
+    def remove() -> None:
+        if callback in _termination_callbacks:
+            _termination_callbacks.remove(callback)
+            if not _termination_callbacks:
+                for sig in TERMINATION_SIGNALS:
+                    loop.remove_signal_handler(sig)
+
+    return remove
+
+
+def _signal_group(pgid: int, sig: int) -> bool:
+    """Send ``sig`` to the process group; return False if it no longer exists."""
+    try:
+        os.killpg(pgid, sig)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Group id was recycled by a process we don't own; treat as gone
+        return False
+
+
+def group_alive(pgid: int) -> bool:
+    """Whether any process is left in the group."""
+    return _signal_group(pgid, 0)
+
+
+async def wait_for_exit(process: "asyncio.subprocess.Process") -> int:
+    """
+    Wait for the process itself to exit and return its exit code.
+
+    ``Process.wait()`` only returns once the stdout and stderr pipes are
+    closed too, which a leftover child holding them can delay indefinitely;
+    ``returncode`` is set as soon as the leader has been reaped.
+    """
+    waiter = asyncio.ensure_future(process.wait())
+    try:
+        while process.returncode is None and not waiter.done():
+            await asyncio.wait({waiter}, timeout=GROUP_POLL_INTERVAL)
+    finally:
+        waiter.cancel()
+    return process.returncode if process.returncode is not None else waiter.result()
+
+
+async def _wait_for_group_exit(
+    process: "asyncio.subprocess.Process", pgid: int, timeout: float
+) -> bool:
+    """Wait up to ``timeout`` seconds for the whole group to exit."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        if process.returncode is None:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=GROUP_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        if process.returncode is not None and not group_alive(pgid):
+            return True
+        if loop.time() >= deadline:
+            return False
+        if process.returncode is not None:
+            await asyncio.sleep(GROUP_POLL_INTERVAL)
+
+
+async def terminate_process_tree(
+    process: "asyncio.subprocess.Process",
+    grace_seconds: float = DEFAULT_TIMEOUT_GRACE_SECONDS,
+) -> None:
+    """
+    Stop the process and everything it spawned.
+
+    Sends SIGTERM to the whole process group, waits up to ``grace_seconds``
+    for it to exit (returning as soon as it does), then escalates to SIGKILL.
+    """
+    if not _USE_PROCESS_GROUPS:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=grace_seconds)
+            except asyncio.TimeoutError:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+        return
+
+    pgid = process.pid
+    if not _signal_group(pgid, signal.SIGTERM):
+        return
+
+    if await _wait_for_group_exit(process, pgid, grace_seconds):
+        return
+
+    print(f"Process group {pgid} still running after {grace_seconds}s, sending SIGKILL")
+    _signal_group(pgid, signal.SIGKILL)
+    # SIGKILL cannot be ignored; only the leader needs reaping here, orphans
+    # are reaped by init
+    if process.returncode is None:
+        try:
+            await asyncio.wait_for(process.wait(), timeout=grace_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def reap_orphans(
+    process: "asyncio.subprocess.Process",
+    grace_seconds: float = DEFAULT_TIMEOUT_GRACE_SECONDS,
+) -> None:
+    """Terminate any processes left in the group after the leader exited."""
+    if _USE_PROCESS_GROUPS and group_alive(process.pid):
+        print("Cleaning up processes left behind by Claude")
+        await terminate_process_tree(process, grace_seconds)
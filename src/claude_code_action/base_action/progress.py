@@ -0,0 +1,200 @@
+"""Live progress updates for the Claude tracking comment."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+DEFAULT_PROGRESS_UPDATE_INTERVAL_SECONDS = 15.0
+
+# Give up on live updates after this many consecutive failed PATCHes
+MAX_CONSECUTIVE_FAILURES = 3
+
+# Tools whose ``file_path``-style inputs count as edits
+FILE_EDIT_TOOLS = {
+    "Edit": "file_path",
+    "MultiEdit": "file_path",
+    "Write": "file_path",
+    "NotebookEdit": "notebook_path",
+}
+
+# Once Claude writes the tracking comment itself, stop overwriting it
+COMMENT_UPDATE_TOOL = "mcp__github_file_ops__update_claude_comment"
+
+MAX_LISTED_FILES = 20
+
+
+class ProgressTracker:
+    """Turn stream-json events into a Markdown progress checklist."""
+
+    def __init__(self, claude_branch: Optional[str] = None, job_link: Optional[str] = None):
+        self.claude_branch = claude_branch
+        self.job_link = job_link
+        self.turn = 0
+        self._seen_messages: Set[str] = set()
+        self.tool_calls: Dict[str, int] = {}
+        self.running: Dict[str, str] = {}
+        self.files_edited: List[str] = []
+        self.finished = False
+        self.comment_taken_over = False
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Update the progress state from one stream-json event."""
+        event_type = event.get("type")
+        message = event.get("message") or {}
+
+        if event_type == "assistant":
+            # One event per content block, all sharing the message id
+            message_id = message.get("id")
+            if message_id is None or message_id not in self._seen_messages:
+                if message_id is not None:
+                    self._seen_messages.add(message_id)
+                self.turn += 1
+            for block in message.get("content") or []:
+                if not isinstance(block, dict) or block.get("type") != "tool_use":
+                    continue
+                name = block.get("name", "unknown")
+                self.tool_calls[name] = self.tool_calls.get(name, 0) + 1
+                self.running[block.get("id", "")] = name
+                if name == COMMENT_UPDATE_TOOL:
+                    self.comment_taken_over = True
+                self._record_edit(name, block.get("input") or {})
+        elif event_type == "user" and isinstance(message.get("content"), list):
+            for block in message["content"]:
+                if isinstance(block, dict) and block.get("type") == "tool_result":
+                    self.running.pop(block.get("tool_use_id", ""), None)
+        elif event_type == "result":
+            self.finished = True
+            self.running.clear()
+
+    def _record_edit(self, tool: str, tool_input: Dict[str, Any]) -> None:
+        paths: List[str] = []
+        if tool in FILE_EDIT_TOOLS:
+            path = tool_input.get(FILE_EDIT_TOOLS[tool])
+            if isinstance(path, str):
+                paths.append(path)
+        elif tool.endswith("__commit_files"):
+            paths.extend(p for p in tool_input.get("files") or [] if isinstance(p, str))
+
+        for path in paths:
+            if path not in self.files_edited:
+                self.files_edited.append(path)
+
+    def render(self) -> str:
+        """Render the comment body for the current state."""
+        header = "✅ **Finishing up...**" if self.finished else "🔄 **Working on your request...**"
+        lines = [f"{header} (turn {self.turn})"]
+
+        if self.claude_branch:
+            lines += ["", f"Branch: `{self.claude_branch}`"]
+
+        if self.tool_calls:
+            running_names = set(self.running.values())
+            lines += ["", "**Tools used**"]
+            for name, count in self.tool_calls.items():
+                check = " " if name in running_names else "x"
+                suffix = f" ×{count}" if count > 1 else ""
+                status = " (running)" if name in running_names else ""
+                lines.append(f"- [{check}] `{name}`{suffix}{status}")
+
+        if self.files_edited:
+            lines += ["", "**Files edited**"]
+            lines += [f"- `{path}`" for path in self.files_edited[:MAX_LISTED_FILES]]
+            if len(self.files_edited) > MAX_LISTED_FILES:
+                lines.append(f"- ...and {len(self.files_edited) - MAX_LISTED_FILES} more")
+
+        if self.job_link:
+            lines += ["", f"[View job run]({self.job_link})"]
+
+        return "\n".join(lines)
+
+
+class DebouncedCommentUpdater:
+    """
+    Coalesce comment bodies and PATCH at most once per ``min_interval``.
+
+    Only the latest body is kept; bodies identical to the last one sent are
+    skipped, so bursts of events cost a single request.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        min_interval: float = DEFAULT_PROGRESS_UPDATE_INTERVAL_SECONDS,
+    ):
+        self.send = send
+        self.min_interval = min_interval
+        self.requests_sent = 0
+        self.updates_skipped = 0
+        self._pending: Optional[str] = None
+        self._last_sent: Optional[str] = None
+        self._last_sent_at = 0.0
+        self._failures = 0
+        self._disabled = False
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> "DebouncedCommentUpdater":
+        """Start the background flush task."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def update(self, body: str) -> None:
+        """Offer a new body; it replaces any body not yet sent."""
+        if self._disabled:
+            return
+        if self._pending is not None:
+            self.updates_skipped += 1
+        self._pending = body
+        self._wake.set()
+
+    def disable(self) -> None:
+        """Drop pending updates and stop sending."""
+        self._disabled = True
+        self._pending = None
+
+    async def _flush(self) -> None:
+        body, self._pending = self._pending, None
+        if body is None or body == self._last_sent or self._disabled:
+            return
+        try:
+            await self.send(body)
+            self._last_sent = body
+            self._failures = 0
+            self.requests_sent += 1
+        except Exception as e:
+            self._failures += 1
+            print(f"::warning::Failed to update progress comment: {e}")
+            if self._failures >= MAX_CONSECUTIVE_FAILURES:
+                print("::warning::Disabling live progress updates after repeated failures")
+                self.disable()
+        finally:
+            self._last_sent_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while not self._closed:
+            await self._wake.wait()
+            self._wake.clear()
+            delay = self._last_sent_at + self.min_interval - time.monotonic()
+            if delay > 0 and not self._closed:
+                try:
+                    await asyncio.wait_for(self._closing(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            if not self._closed:
+                await self._flush()
+
+    async def _closing(self) -> None:
+        while not self._closed:
+            await self._wake.wait()
+            self._wake.clear()
+
+    async def aclose(self, flush: bool = True) -> None:
+        """Stop the updater, optionally sending the last pending body."""
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        if flush:
+            await self._flush()
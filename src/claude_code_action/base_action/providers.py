@@ -0,0 +1,128 @@
+"""Model providers and failover between them."""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+PROVIDERS = ("anthropic", "bedrock", "vertex")
+
+# Errors that mean the endpoint is out of capacity rather than the request
+# being wrong: Anthropic overloaded/rate limit, Bedrock throttling, Vertex quota
+CAPACITY_ERROR_PATTERN = re.compile(
+    r"overloaded_error|\bOverloaded\b|rate_limit_error|Too Many Requests"
+    r"|ThrottlingException|ServiceUnavailableException|RESOURCE_EXHAUSTED"
+    # Bare status codes only after a status keyword, not as line numbers or sizes
+    r"""|(?i:\bstatus(?:[ _]?code)?|\bHTTP(?:/[\d.]+)?|\bAPI Error)["']?[\s:=]*(?:429|529)\b""",
+)
+
+# Tools that change the workspace or the repository; after one of these ran,
+# re-launching on another provider could apply work twice
+MUTATING_TOOLS = {"Edit", "MultiEdit", "Write", "NotebookEdit", "Bash"}
+MUTATING_TOOL_SUFFIXES = ("__commit_files", "__delete_files")
+
+
+@dataclass
+class Provider:
+    """A model endpoint and the model id to use with it."""
+    name: str
+    model: Optional[str] = None
+
+    def env(self) -> Dict[str, str]:
+        """
+        Environment that points the CLI at this provider.
+
+        Model ids differ per provider, so without an explicit model the
+        primary's ANTHROPIC_MODEL is cleared and the CLI uses this
+        provider's default.
+        """
+        return {
+            "CLAUDE_CODE_USE_BEDROCK": "1" if self.name == "bedrock" else "",
+            "CLAUDE_CODE_USE_VERTEX": "1" if self.name == "vertex" else "",
+            "ANTHROPIC_MODEL": self.model or "",
+        }
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.model})" if self.model else self.name
+
+
+def primary_provider() -> Provider:
+    """The provider selected by the environment."""
+    if os.environ.get("CLAUDE_CODE_USE_BEDROCK") == "1":
+        name = "bedrock"
+    elif os.environ.get("CLAUDE_CODE_USE_VERTEX") == "1":
+        name = "vertex"
+    else:
+        name = "anthropic"
+    return Provider(name, os.environ.get("ANTHROPIC_MODEL") or None)
+
+
+def parse_provider_fallbacks(value: Optional[str]) -> List[Provider]:
+    """
+    Parse the ordered fallback list.
+
+    Entries are separated by newlines or commas and have the form
+    ``provider`` or ``provider=model``; ``#`` starts a comment.
+    """
+    fallbacks: List[Provider] = []
+    if not value:
+        return fallbacks
+
+    for line in value.split("\n"):
+        for entry in line.split("#", 1)[0].split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            name, _, model = entry.partition("=")
+            name = name.strip().lower()
+            if name not in PROVIDERS:
+                raise ValueError(
+                    f"Unknown provider '{name}' in provider_fallbacks; expected one of {', '.join(PROVIDERS)}"
+                )
+            fallbacks.append(Provider(name, model.strip() or None))
+    return fallbacks
+
+
+def is_capacity_error(text: str) -> bool:
+    """Whether an error message indicates an overloaded or rate limited endpoint."""
+    return bool(CAPACITY_ERROR_PATTERN.search(text))
+
+
+class CapacityErrorDetector:
+    """
+    Watch a run for capacity errors that happen before any edits.
+
+    Only such runs are safe to re-launch on another provider.
+    """
+
+    def __init__(self) -> None:
+        self.capacity_error: Optional[str] = None
+        self.edits_made = False
+
+    @property
+    def failover_eligible(self) -> bool:
+        return self.capacity_error is not None and not self.edits_made
+
+    def _record(self, text: str) -> None:
+        if self.capacity_error is None and is_capacity_error(text):
+            self.capacity_error = " ".join(text.split())[:200]
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Inspect one stream-json event."""
+        event_type = event.get("type")
+        if event_type == "assistant":
+            for block in (event.get("message") or {}).get("content") or []:
+                if not isinstance(block, dict):
+                    continue
+                if block.get("type") == "tool_use":
+                    name = block.get("name", "")
+                    if name in MUTATING_TOOLS or name.endswith(MUTATING_TOOL_SUFFIXES):
+                        self.edits_made = True
+                elif block.get("type") == "text" and block.get("text", "").startswith("API Error"):
+                    self._record(block["text"])
+        elif event_type == "result" and event.get("is_error"):
+            self._record(str(event.get("result", "")))
+
+    def observe_stderr(self, text: str) -> None:
+        """Inspect the captured stderr of the run."""
+        self._record(text)
@@ -0,0 +1,218 @@
+"""Redaction of secrets from everything the action writes to its logs."""
+
+import json
+import os
+import re
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Pattern, Set, TextIO, Tuple
+
+REDACTED = "***"
+
+# Shorter values are too likely to occur by accident to be redacted safely
+MIN_SECRET_LENGTH = 8
+
+# Environment variable names whose values are treated as secrets. Bare KEY
+# and AUTH are left out: CACHE_KEY or SSH_AUTH_SOCK hold ordinary values
+SENSITIVE_NAME_PATTERN = re.compile(
+    r"(?:^|_)(?:TOKEN|SECRET|PASSWORD|PASSWD|API_KEY|ACCESS_KEY|SECRET_KEY|PRIVATE_KEY"
+    r"|CREDENTIALS?|AUTHORIZATION)(?:$|_)",
+    re.IGNORECASE,
+)
+
+# Well known credential formats, redacted even when their value is unknown
+TOKEN_PATTERNS = (
+    r"gh[pousr]_[A-Za-z0-9]{36,}",
+    r"github_pat_[A-Za-z0-9_]{22,}",
+    r"sk-ant-[A-Za-z0-9_\-]{20,}",
+    r"(?:AKIA|ASIA)[0-9A-Z]{16}",
+    r"eyJ[A-Za-z0-9_\-]{10,}\.eyJ[A-Za-z0-9_\-]{10,}\.[A-Za-z0-9_\-]{10,}",
+)
+
+# Literal prefixes of TOKEN_PATTERNS; text containing none of them (and no
+# registered secret) cannot match and skips the regex entirely
+TOKEN_MARKERS = ("ghp_", "gho_", "ghu_", "ghs_", "ghr_", "github_pat_", "sk-ant-", "AKIA", "ASIA", "eyJ")
+
+# Unbroken line lengths after which buffered text is redacted and written anyway
+MAX_PENDING_CHARS = 64 * 1024
+
+
+def is_sensitive_name(name: str) -> bool:
+    """Whether an environment variable name suggests its value is a secret."""
+    return bool(SENSITIVE_NAME_PATTERN.search(name))
+
+
+def looks_like_secret(value: str) -> bool:
+    """
+    Heuristic for credential-like values: long, unbroken and mixing upper
+    case, lower case and digits (which model ids and commit SHAs do not).
+    """
+    return (
+        len(value) >= 20
+        and not any(c.isspace() for c in value)
+        and any(c.isdigit() for c in value)
+        and any(c.isupper() for c in value)
+        and any(c.islower() for c in value)
+        and not value.startswith(("/", "./", "http://", "https://"))
+    )
+
+
+def secrets_from_environment(env: Optional[Dict[str, str]] = None) -> List[str]:
+    """Values of sensitive environment variables."""
+    env = os.environ if env is None else env
+    return [value for name, value in env.items() if value and is_sensitive_name(name)]
+
+
+def secrets_from_custom_env(custom_env: Dict[str, str]) -> List[str]:
+    """Values of ``claude_env`` entries that are named or shaped like secrets."""
+    return [
+        value
+        for name, value in custom_env.items()
+        if value and (is_sensitive_name(name) or looks_like_secret(value))
+    ]
+
+
+def secrets_from_mcp_config(mcp_config: Optional[str]) -> List[str]:
+    """Values of the ``env`` and ``headers`` maps of inline MCP server configs."""
+    if not mcp_config or not mcp_config.lstrip().startswith("{"):
+        return []
+    try:
+        config = json.loads(mcp_config)
+    except json.JSONDecodeError:
+        return []
+
+    secrets = []
+    servers = config.get("mcpServers") if isinstance(config, dict) else None
+    for server in (servers or {}).values():
+        if not isinstance(server, dict):
+            continue
+        for section in ("env", "headers"):
+            values = server.get(section)
+            if isinstance(values, dict):
+                secrets.extend(
+                    value for name, value in values.items()
+                    if isinstance(value, str) and (is_sensitive_name(name) or looks_like_secret(value))
+                )
+    return secrets
+
+
+class Redactor:
+    """
+    Replace known secret values and credential-shaped strings with ``***``.
+
+    Clean text is the overwhelmingly common case, so it is screened with
+    plain substring checks (which run at memory speed, unlike a regex
+    alternation of many unrelated literals). Only text containing a secret
+    or a token prefix goes through the combined pattern.
+    """
+
+    def __init__(self, secrets: Iterable[str] = ()):
+        self._secrets: Set[str] = set()
+        self._needles: Tuple[str, ...] = TOKEN_MARKERS
+        self._pattern: Pattern[str] = re.compile("|".join(TOKEN_PATTERNS))
+        self._lock = threading.Lock()
+        self.add(secrets)
+
+    def add(self, secrets: Iterable[str]) -> None:
+        """Register more secret values and recompile the matcher."""
+        variants = set()
+        for secret in secrets:
+            if not secret:
+                continue
+            # Multi-line secrets (e.g. private keys) are logged line by line;
+            # their JSON-escaped form shows up in the stream-json output
+            for part in [secret, json.dumps(secret)[1:-1], *secret.splitlines()]:
+                part = part.strip()
+                if len(part) >= MIN_SECRET_LENGTH:
+                    variants.add(part)
+
+        with self._lock:
+            if variants <= self._secrets:
+                return
+            self._secrets |= variants
+            # Longest first so a secret containing another is removed whole
+            literals = sorted(self._secrets, key=len, reverse=True)
+            self._pattern = re.compile("|".join([re.escape(s) for s in literals] + list(TOKEN_PATTERNS)))
+            self._needles = tuple(literals) + TOKEN_MARKERS
+
+    def redact(self, text: str) -> str:
+        """Return ``text`` with every secret replaced."""
+        for needle in self._needles:
+            if needle in text:
+                return self._pattern.sub(REDACTED, text)
+        return text
+
+
+class RedactingStream:
+    """
+    Text stream wrapper that redacts everything written through it.
+
+    Output is redacted a line at a time so a secret split across two
+    ``write`` calls is still caught.
+    """
+
+    def __init__(self, stream: TextIO, redactor: Redactor):
+        self.stream = stream
+        self.redactor = redactor
+        self._pending = ""
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            data = self._pending + text
+            end = data.rfind("\n") + 1
+            if end == 0 and len(data) < MAX_PENDING_CHARS:
+                self._pending = data
+                return len(text)
+            if end == 0:
+                end = len(data)
+            self._pending = data[end:]
+            self.stream.write(self.redactor.redact(data[:end]))
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending:
+                self.stream.write(self.redactor.redact(self._pending))
+                self._pending = ""
+        self.stream.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self.stream, name)
+
+
+_redactor = Redactor()
+
+
+def get_redactor() -> Redactor:
+    """The process-wide redactor."""
+    return _redactor
+
+
+def install_redactor() -> Redactor:
+    """
+    Seed the process-wide redactor from the environment and route
+    ``sys.stdout`` and ``sys.stderr`` through it. Safe to call repeatedly.
+    """
+    _redactor.add(secrets_from_environment())
+    if not isinstance(sys.stdout, RedactingStream):
+        sys.stdout = RedactingStream(sys.stdout, _redactor)
+    if not isinstance(sys.stderr, RedactingStream):
+        sys.stderr = RedactingStream(sys.stderr, _redactor)
+    return _redactor
+
+
+def mask_secret(value: str) -> None:
+    """
+    Redact ``value`` from this process's output and ask the runner to mask
+    it in later steps as well.
+    """
+    if not value:
+        return
+    stream = sys.stdout.stream if isinstance(sys.stdout, RedactingStream) else sys.stdout
+    sys.stdout.flush()
+    for line in value.splitlines():
+        if line.strip():
+            stream.write(f"::add-mask::{line}\n")
+    stream.flush()
+    _redactor.add([value])
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Render a bounded Markdown report of a Claude run and archive the full
+execution log in compressed form
+"""
+
+import codecs
+import gzip
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from .metrics import ExecutionMetrics
+from .run_claude import set_output
+
+COMPRESSION_FORMATS = ("gzip", "zstd", "none")
+DEFAULT_COMPRESSION = "gzip"
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Keep the summary far below the 1 MiB step summary limit
+MAX_REPORT_CHARS = 64 * 1024
+MAX_RESULT_CHARS = 8 * 1024
+MAX_ERRORS = 10
+MAX_ERROR_CHARS = 300
+MAX_TOOL_ROWS = 30
+
+
+def _zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _open_archive(path: str, compression: str) -> BinaryIO:
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=10).stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=6)
+
+
+def archive_path(execution_file: str, compression: str) -> Optional[str]:
+    """Path of the compressed copy of ``execution_file``."""
+    if compression == "none":
+        return None
+    return execution_file + (".zst" if compression == "zstd" else ".gz")
+
+
+def iter_execution_events(
+    execution_file: str, archive: Optional[BinaryIO] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the events of an execution file without loading it whole.
+
+    The raw bytes are also copied to ``archive`` as they are read, so the
+    file is read exactly once. An event cut off by the end of the buffer is
+    only decoded again once the undecoded text has doubled, so an event of
+    many chunks is parsed a bounded number of times rather than per chunk.
+    """
+    decoder = json.JSONDecoder()
+    # Multibyte characters may straddle chunk boundaries
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    position = 0
+    pending: List[str] = []
+    pending_chars = 0
+    retry_at = 0
+    with open(execution_file, "rb") as f:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if archive is not None and chunk:
+                archive.write(chunk)
+            text = utf8.decode(chunk, final=not chunk)
+            pending.append(text)
+            pending_chars += len(text)
+            if chunk and len(buffer) - position + pending_chars < retry_at:
+                continue
+
+            buffer = buffer[position:] + "".join(pending)
+            position = 0
+            pending = []
+            pending_chars = 0
+            while True:
+                # Skip the array punctuation between events
+                while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                    position += 1
+                if position >= len(buffer):
+                    retry_at = 0
+                    break
+                try:
+                    event, position = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if not chunk:
+                        # Truncated trailing event
+                        return
+                    retry_at = 2 * (len(buffer) - position)
+                    break
+                if isinstance(event, dict):
+                    yield event
+
+            if not chunk:
+                return
+
+
+def _excerpt(text: str, limit: int) -> str:
+    text = text.strip()
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _tool_result_text(block: Dict[str, Any]) -> str:
+    content = block.get("content")
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") for part in content if isinstance(part, dict)
+        )
+    return str(content or "")
+
+
+@dataclass
+class RunReport:
+    """Everything the Markdown report needs, gathered in one pass."""
+    metrics: ExecutionMetrics = field(default_factory=ExecutionMetrics)
+    errors: List[str] = field(default_factory=list)
+    error_count: int = 0
+    final_result: Optional[str] = None
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        self.metrics.observe(event)
+        event_type = event.get("type")
+
+        if event_type == "user":
+            content = (event.get("message") or {}).get("content")
+            for block in content if isinstance(content, list) else []:
+                if isinstance(block, dict) and block.get("type") == "tool_result" and block.get("is_error"):
+                    self._error(f"Tool error: {_tool_result_text(block)}")
+        elif event_type == "result":
+            if isinstance(event.get("result"), str):
+                self.final_result = event["result"]
+            if event.get("is_error"):
+                self._error(f"Run error: {event.get('result') or event.get('subtype')}")
+
+    def _error(self, text: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(_excerpt(" ".join(text.split()), MAX_ERROR_CHARS))
+
+
+def render_markdown(
+    report: RunReport,
+    stored_metrics: Optional[Dict[str, Any]] = None,
+    archive: Optional[str] = None,
+    artifact_name: Optional[str] = None,
+) -> str:
+    """Render the report, bounded to ``MAX_REPORT_CHARS``."""
+    metrics = report.metrics.to_dict()
+    # Tool latencies are only meaningful when measured live, not on replay
+    live_tools = (stored_metrics or {}).get("tools")
+    tools = live_tools or metrics["tools"]
+    summary = stored_metrics or metrics
+    usage = summary.get("usage") or {}
+
+    lines = ["## Claude Code Report", ""]
+    lines += [
+        "| Metric | Value |",
+        "| --- | --- |",
+        f"| Result | {summary.get('result') or 'unknown'} |",
+        f"| Turns | {summary.get('num_turns', 0)} |",
+    ]
+    if summary.get("duration_ms") is not None:
+        lines.append(f"| Duration | {summary['duration_ms'] / 1000:.1f}s |")
+    if summary.get("cost_usd") is not None:
+        lines.append(f"| Cost | ${summary['cost_usd']:.4f} |")
+    lines += [
+        f"| Input tokens | {usage.get('input_tokens', 0)} |",
+        f"| Output tokens | {usage.get('output_tokens', 0)} |",
+        f"| Cache read / write tokens | {usage.get('cache_read_input_tokens', 0)} / "
+        f"{usage.get('cache_creation_input_tokens', 0)} |",
+        f"| Events | {metrics['event_count']} |",
+    ]
+
+    if tools:
+        lines += ["", "### Tools", "", "| Tool | Calls | Errors | Mean | Max |", "| --- | --- | --- | --- | --- |"]
+        ranked = sorted(tools.items(), key=lambda item: -item[1].get("calls", 0))
+        for name, stats in ranked[:MAX_TOOL_ROWS]:
+            mean = stats.get("mean_seconds") if live_tools else None
+            peak = stats.get("max_seconds") if live_tools else None
+            lines.append(
+                f"| `{name}` | {stats.get('calls', 0)} | {stats.get('errors', 0)} | "
+                f"{'-' if mean is None else f'{mean:.2f}s'} | {'-' if peak is None else f'{peak:.2f}s'} |"
+            )
+        if len(ranked) > MAX_TOOL_ROWS:
+            lines.append(f"| ...{len(ranked) - MAX_TOOL_ROWS} more | | | | |")
+
+    if report.errors:
+        lines += ["", f"### Errors ({report.error_count})", ""]
+        lines += [f"- {error}" for error in report.errors]
+        if report.error_count > len(report.errors):
+            lines.append(f"- ...and {report.error_count - len(report.errors)} more")
+
+    if report.final_result:
+        lines += ["", "### Final Result", "", _excerpt(report.final_result, MAX_RESULT_CHARS)]
+
+    if archive and artifact_name:
+        lines += ["", f"Full execution log: `{os.path.basename(archive)}` in the `{artifact_name}` artifact"]
+    elif archive:
+        lines += ["", f"Full execution log: `{archive}`"]
+
+    markdown = "\n".join(lines) + "\n"
+    if len(markdown) > MAX_REPORT_CHARS:
+        markdown = markdown[: MAX_REPORT_CHARS - 40] + "\n\n_Report truncated._\n"
+    return markdown
+
+
+def generate_report(
+    execution_file: str,
+    metrics_file: Optional[str] = None,
+    compression: str = DEFAULT_COMPRESSION,
+    artifact_name: Optional[str] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Build the Markdown report and the compressed log archive, which the
+    report refers to by ``artifact_name`` if it is uploaded as an artifact.
+    """
+    if compression not in COMPRESSION_FORMATS:
+        raise ValueError(
+            f"report_compression must be one of {', '.join(COMPRESSION_FORMATS)}, got: {compression}"
+        )
+
+    if compression == "zstd" and not _zstd_available():
+        print("::warning::zstd compression requires the 'zstandard' package, using gzip")
+        compression = "gzip"
+
+    archive_file = archive_path(execution_file, compression)
+    archive = _open_archive(archive_file, compression) if archive_file else None
+    report = RunReport()
+    try:
+        for event in iter_execution_events(execution_file, archive):
+            report.observe(event)
+    finally:
+        if archive is not None:
+            archive.close()
+
+    stored_metrics = None
+    if metrics_file and os.path.exists(metrics_file):
+        try:
+            with open(metrics_file) as f:
+                stored_metrics = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    return {
+        "markdown": render_markdown(report, stored_metrics, archive_file, artifact_name),
+        "archive": archive_file,
+    }
+
+
+def main() -> None:
+    """Main entry point."""
+    execution_file = os.environ.get("EXECUTION_FILE", "")
+    if not execution_file or not os.path.exists(execution_file):
+        print("No execution file to report on")
+        return
+
+    try:
+        result = generate_report(
+            execution_file,
+            os.environ.get("METRICS_FILE") or None,
+            os.environ.get("REPORT_COMPRESSION") or DEFAULT_COMPRESSION,
+            os.environ.get("ARCHIVE_ARTIFACT_NAME") or None,
+        )
+    except Exception as error:
+        print(f"::error::Failed to generate Claude Code report: {error}")
+        sys.exit(1)
+
+    if step_summary := os.environ.get("GITHUB_STEP_SUMMARY"):
+        with open(step_summary, "a") as f:
+            f.write(result["markdown"])
+    else:
+        print(result["markdown"])
+
+    if result["archive"]:
+        print(f"Execution log archived to {result['archive']}")
+        set_output("execution_archive", result["archive"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Sample CPU, memory and I/O of the Claude process tree from /proc."""
+
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+DEFAULT_SAMPLE_INTERVAL_SECONDS = 1.0
+
+PROC_ROOT = "/proc"
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+@dataclass
+class ResourceReport:
+    """Peak and cumulative resource usage of the process tree."""
+    samples: int = 0
+    interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS
+    peak_rss_bytes: int = 0
+    peak_processes: int = 0
+    cpu_seconds: float = 0.0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    processes_seen: int = 0
+
+    def outputs(self) -> Dict[str, str]:
+        """Return the values exposed as GitHub Actions step outputs."""
+        return {
+            "peak_rss_mb": f"{self.peak_rss_bytes / (1024 * 1024):.1f}",
+            "cpu_seconds": f"{self.cpu_seconds:.2f}",
+        }
+
+
+def _read_stat(pid: int) -> Optional[Tuple[int, int, float, int]]:
+    """Return (ppid, pgrp, cpu_seconds, rss_bytes) for a pid."""
+    try:
+        with open(f"{PROC_ROOT}/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; fields resume after the last ')'
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+        ppid = int(fields[1])
+        pgrp = int(fields[2])
+        cpu_ticks = int(fields[11]) + int(fields[12])
+        rss_pages = int(fields[21])
+    except (IndexError, ValueError):
+        return None
+    return ppid, pgrp, cpu_ticks / _CLOCK_TICKS, rss_pages * _PAGE_SIZE
+
+
+def _read_io(pid: int) -> Optional[Tuple[int, int]]:
+    """Return (read_bytes, write_bytes) for a pid, or None if unavailable."""
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"{PROC_ROOT}/{pid}/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return read_bytes, write_bytes
+
+
+class ResourceMonitor:
+    """
+    Periodically sample the process tree rooted at ``root_pid``.
+
+    The tree is every process in the root's process group plus any
+    descendant that started its own group. CPU and I/O counters are kept
+    per pid at their highest sampled value, so processes that exit between
+    samples (or while being sampled) still count up to their last
+    observation. The /proc scan runs in the default executor, off the
+    event loop that reads Claude's output.
+    """
+
+    def __init__(self, root_pid: int, interval_seconds: float = DEFAULT_SAMPLE_INTERVAL_SECONDS):
+        self.root_pid = root_pid
+        self.report = ResourceReport(interval_seconds=interval_seconds)
+        self._cpu: Dict[int, float] = {}
+        self._io: Dict[int, Tuple[int, int]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @staticmethod
+    def available() -> bool:
+        """Whether /proc based sampling is supported on this host."""
+        return os.path.isdir(f"{PROC_ROOT}/self")
+
+    def _tree(self) -> Dict[int, Tuple[float, int]]:
+        stats = {}
+        parents: Dict[int, int] = {}
+        for entry in os.listdir(PROC_ROOT):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            stat = _read_stat(pid)
+            if stat is None:
+                continue
+            ppid, pgrp, cpu_seconds, rss_bytes = stat
+            parents[pid] = ppid
+            stats[pid] = (pgrp, cpu_seconds, rss_bytes)
+
+        members: Set[int] = {pid for pid, (pgrp, _, _) in stats.items() if pgrp == self.root_pid}
+        members.add(self.root_pid)
+        for pid in stats:
+            ancestor = parents.get(pid)
+            chain = [pid]
+            while ancestor and ancestor not in members and ancestor in parents and len(chain) < 64:
+                chain.append(ancestor)
+                ancestor = parents.get(ancestor)
+            if ancestor in members:
+                members.update(chain)
+
+        return {pid: stats[pid][1:] for pid in members if pid in stats}
+
+    def _collect(self) -> Dict[int, Tuple[float, int, Optional[Tuple[int, int]]]]:
+        """Read (cpu_seconds, rss_bytes, io) of every process in the tree."""
+        return {pid: (cpu_seconds, rss, _read_io(pid)) for pid, (cpu_seconds, rss) in self._tree().items()}
+
+    def _record(self, tree: Dict[int, Tuple[float, int, Optional[Tuple[int, int]]]]) -> None:
+        report = self.report
+        report.samples += 1
+        report.peak_processes = max(report.peak_processes, len(tree))
+        report.peak_rss_bytes = max(report.peak_rss_bytes, sum(rss for _, rss, _ in tree.values()))
+
+        for pid, (cpu_seconds, _, io) in tree.items():
+            self._cpu[pid] = max(self._cpu.get(pid, 0.0), cpu_seconds)
+            if io is not None:
+                read_bytes, write_bytes = self._io.get(pid, (0, 0))
+                self._io[pid] = (max(read_bytes, io[0]), max(write_bytes, io[1]))
+
+        report.processes_seen = len(self._cpu)
+        report.cpu_seconds = round(sum(self._cpu.values()), 2)
+        report.read_bytes = sum(read for read, _ in self._io.values())
+        report.write_bytes = sum(write for _, write in self._io.values())
+
+    def sample(self) -> None:
+        """Take one sample of the process tree."""
+        self._record(self._collect())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._record(await loop.run_in_executor(None, self._collect))
+            except OSError:
+                pass
+            await asyncio.sleep(self.report.interval_seconds)
+
+    def start(self) -> "ResourceMonitor":
+        """Start sampling in the background."""
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self) -> ResourceReport:
+        """Stop sampling and return the report."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return self.report
+
+    def write(self, path: str) -> None:
+        """Write the report JSON to ``path``."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(asdict(self.report), f, indent=2)
@@ -0,0 +1,155 @@
+"""Local result cache for deterministic Claude runs."""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Bump when the cache key inputs or layout change
+CACHE_VERSION = "1"
+
+EXECUTION_FILE = "execution.json"
+METRICS_FILE = "metrics.json"
+ENTRY_FILE = "entry.json"
+
+# Outputs replayed from the original run on a cache hit
+CACHED_OUTPUTS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "cost_usd",
+    "num_turns",
+    "duration_ms",
+)
+
+# Environment that selects the model endpoint and therefore the outcome
+MODEL_ENV_VARS = (
+    "ANTHROPIC_MODEL",
+    "CLAUDE_CODE_USE_BEDROCK",
+    "CLAUDE_CODE_USE_VERTEX",
+)
+
+
+def repository_tree_sha(cwd: Optional[str] = None) -> Optional[str]:
+    """
+    Return the tree SHA of HEAD for a clean checkout.
+
+    Returns None when ``cwd`` is not a git repository or has uncommitted
+    changes, since the tree SHA would not describe what Claude sees.
+    """
+    try:
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+        if status.stdout.strip():
+            return None
+        tree = subprocess.run(
+            ["git", "rev-parse", "HEAD^{tree}"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return tree.stdout.strip() or None
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Store successful runs keyed by a hash of everything that determines them.
+
+    Each entry is a directory named after the key holding the execution log,
+    the metrics file and the headline outputs. Entries are written to a
+    temporary directory and renamed into place, so concurrent writers and
+    interrupted runs never leave a partial entry behind.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def compute_key(
+        self,
+        prompt_path: str,
+        claude_args: List[str],
+        custom_env: Dict[str, str],
+        cwd: Optional[str] = None,
+    ) -> Optional[str]:
+        """Return the cache key for a run, or None if it is not cacheable."""
+        tree_sha = repository_tree_sha(cwd)
+        if tree_sha is None:
+            return None
+
+        material = {
+            "version": CACHE_VERSION,
+            "prompt_sha256": _file_sha256(prompt_path),
+            "claude_args": claude_args,
+            "model_env": {name: os.environ.get(name, "") for name in MODEL_ENV_VARS},
+            "custom_env": sorted(custom_env.items()),
+            "tree_sha": tree_sha,
+        }
+        encoded = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def restore(
+        self, key: str, execution_file: str, metrics_file: str
+    ) -> Optional[Dict[str, Any]]:
+        """Copy a cached entry to the given paths and return its metadata."""
+        entry_dir = self.directory / key
+        try:
+            with open(entry_dir / ENTRY_FILE) as f:
+                entry = json.load(f)
+            Path(execution_file).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry_dir / EXECUTION_FILE, execution_file)
+            if (entry_dir / METRICS_FILE).exists():
+                shutil.copyfile(entry_dir / METRICS_FILE, metrics_file)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        # Touch the entry so external pruning can keep recently used ones
+        os.utime(entry_dir, None)
+        return entry
+
+    def store(
+        self,
+        key: str,
+        execution_file: str,
+        metrics_file: Optional[str],
+        outputs: Dict[str, str],
+        events: int,
+    ) -> None:
+        """Save a successful run under ``key``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry_dir = self.directory / key
+        if entry_dir.exists():
+            return
+
+        staging = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.directory))
+        try:
+            shutil.copyfile(execution_file, staging / EXECUTION_FILE)
+            if metrics_file and os.path.exists(metrics_file):
+                shutil.copyfile(metrics_file, staging / METRICS_FILE)
+            entry = {
+                "key": key,
+                "created_at": int(time.time()),
+                "events": events,
+                "outputs": {k: v for k, v in outputs.items() if k in CACHED_OUTPUTS},
+            }
+            with open(staging / ENTRY_FILE, "w") as f:
+                json.dump(entry, f, indent=2)
+            os.rename(staging, entry_dir)
+        except OSError:
+            # Another run stored the same key first, or the copy failed
+            shutil.rmtree(staging, ignore_errors=True)
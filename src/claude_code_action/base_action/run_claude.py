@@ -1,12 +1,39 @@
 import os
 import sys
-import json
 import asyncio
-import subprocess
-import tempfile
+import signal
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Optional, Any
-import aiofiles
+
+from .. import json_codec
+from ..github.api.client import create_octokit
+from .budget import BUDGET_EXCEEDED_EXIT_CODE, BudgetGovernor, BudgetLimits
+from .console import DEFAULT_LOG_FORMAT, BufferedConsole, EventRenderer
+from .execution_log import ExecutionLogWriter
+from .metrics import ExecutionMetrics
+from .providers import CapacityErrorDetector, Provider, parse_provider_fallbacks, primary_provider
+from .process_control import (
+    DEFAULT_TIMEOUT_GRACE_SECONDS,
+    on_termination_signal,
+    process_group_kwargs,
+    reap_orphans,
+    terminate_process_tree,
+    wait_for_exit,
+)
+from .progress import (
+    DEFAULT_PROGRESS_UPDATE_INTERVAL_SECONDS,
+    DebouncedCommentUpdater,
+    ProgressTracker,
+)
+from .redact import get_redactor, secrets_from_custom_env, secrets_from_mcp_config
+from .result_cache import ResultCache
+from .resource_monitor import DEFAULT_SAMPLE_INTERVAL_SECONDS, ResourceMonitor, ResourceReport
+from .session_resume import DEFAULT_MAX_RESUME_ATTEMPTS, SessionStore, prompt_digest
+from .stderr_buffer import DEFAULT_STDERR_BUFFER_KB, StderrRingBuffer, drain_stream
+
+# Largest single stream-json line accepted from the CLI (tool results can be big)
+STREAM_LINE_LIMIT = 64 * 1024 * 1024
 
 
 class ClaudeOptions:
@@ -19,6 +46,21 @@ class ClaudeOptions:
         system_prompt: Optional[str] = None,
         append_system_prompt: Optional[str] = None,
         claude_env: Optional[str] = None,
+        stderr_buffer_kb: Optional[str] = None,
+        stderr_file: Optional[str] = None,
+        log_format: Optional[str] = None,
+        timeout_grace_seconds: Optional[str] = None,
+        resource_sample_interval: Optional[str] = None,
+        progress_updates: Optional[str] = None,
+        progress_update_interval: Optional[str] = None,
+        result_cache_dir: Optional[str] = None,
+        resume: Optional[str] = None,
+        resume_state_dir: Optional[str] = None,
+        max_resume_attempts: Optional[str] = None,
+        max_input_tokens: Optional[str] = None,
+        max_output_tokens: Optional[str] = None,
+        max_cost_usd: Optional[str] = None,
+        provider_fallbacks: Optional[str] = None,
     ):
         self.allowed_tools = allowed_tools
         self.disallowed_tools = disallowed_tools
@@ -27,6 +69,21 @@ class ClaudeOptions:
         self.system_prompt = system_prompt
         self.append_system_prompt = append_system_prompt
         self.claude_env = claude_env
+        self.stderr_buffer_kb = stderr_buffer_kb
+        self.stderr_file = stderr_file
+        self.log_format = log_format
+        self.timeout_grace_seconds = timeout_grace_seconds
+        self.resource_sample_interval = resource_sample_interval
+        self.progress_updates = progress_updates
+        self.progress_update_interval = progress_update_interval
+        self.result_cache_dir = result_cache_dir
+        self.resume = resume
+        self.resume_state_dir = resume_state_dir
+        self.max_resume_attempts = max_resume_attempts
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.max_cost_usd = max_cost_usd
+        self.provider_fallbacks = provider_fallbacks
 
 
 class PreparedConfig:
@@ -64,6 +121,15 @@ def parse_custom_env_vars(claude_env: Optional[str]) -> Dict[str, str]:
     return custom_env
 
 
+def set_output(name: str, value: str) -> None:
+    """Set GitHub Actions output."""
+    if github_output := os.environ.get("GITHUB_OUTPUT"):
+        with open(github_output, "a") as f:
+            f.write(f"{name}={value}\n")
+    else:
+        print(f"::set-output name={name}::{value}")
+
+
 def prepare_run_config(prompt_path: str, options: ClaudeOptions) -> PreparedConfig:
     """Prepare the configuration for running Claude."""
     base_args = ["-p", "--verbose", "--output-format", "stream-json"]
@@ -87,6 +153,8 @@ def prepare_run_config(prompt_path: str, options: ClaudeOptions) -> PreparedConf
         claude_args.extend(["--system-prompt", options.system_prompt])
     if options.append_system_prompt:
         claude_args.extend(["--append-system-prompt", options.append_system_prompt])
+    if options.resume:
+        claude_args.extend(["--resume", options.resume])
     
     # Parse custom environment variables
     custom_env = parse_custom_env_vars(options.claude_env)
@@ -94,14 +162,141 @@ def prepare_run_config(prompt_path: str, options: ClaudeOptions) -> PreparedConf
     return PreparedConfig(claude_args, prompt_path, custom_env)
 
 
-async def run_claude(prompt_path: str, options: Dict[str, Optional[str]]) -> None:
-    """Run Claude with the specified configuration."""
+@dataclass
+class ClaudeRunResult:
+    """Outcome of a single Claude execution."""
+    exit_code: int
+    execution_file: str
+    metrics: ExecutionMetrics
+    events: int = 0
+    metrics_file: Optional[str] = None
+    resource_report: Optional[ResourceReport] = None
+    resource_report_file: Optional[str] = None
+    error: Optional[str] = None
+    cache_hit: bool = False
+    cached_outputs: Optional[Dict[str, str]] = None
+    resumed_session_id: Optional[str] = None
+    budget_exceeded: Optional[str] = None
+    capacity_error: Optional[str] = None
+    provider: Optional[str] = None
+    resume_failed: bool = False
+    
+    @property
+    def conclusion(self) -> str:
+        if self.exit_code == 0:
+            return "success"
+        if self.budget_exceeded:
+            return "budget_exceeded"
+        return "failure"
+    
+    def outputs(self) -> Dict[str, str]:
+        """Return the GitHub Actions step outputs for this run."""
+        outputs: Dict[str, str] = {}
+        if self.metrics_file:
+            outputs["metrics_file"] = self.metrics_file
+            outputs.update(self.metrics.headline_outputs())
+        if self.cached_outputs is not None:
+            # Headline numbers of the original run rather than the replay
+            outputs.update(self.cached_outputs)
+        outputs["cache_hit"] = "true" if self.cache_hit else "false"
+        if self.metrics.session_id:
+            outputs["session_id"] = self.metrics.session_id
+        outputs["resumed_session_id"] = self.resumed_session_id or ""
+        if self.provider:
+            outputs["provider"] = self.provider
+        if self.resource_report is not None and self.resource_report_file:
+            outputs["resource_report_file"] = self.resource_report_file
+            outputs.update(self.resource_report.outputs())
+        outputs["conclusion"] = self.conclusion
+        # Expose the execution file on failure too if we captured any events
+        if self.exit_code == 0 or self.events:
+            outputs["execution_file"] = self.execution_file
+        return outputs
+
+
+async def execute_claude(
+    prompt_path: str,
+    options: Dict[str, Optional[str]],
+    output_dir: Optional[str] = None,
+    label: Optional[str] = None,
+    progress_comment: bool = True,
+) -> ClaudeRunResult:
+    """
+    Run Claude and collect its artifacts in ``output_dir``.
+
+    If the run hits a capacity error before making any edits, it is
+    re-launched on the next provider from ``provider_fallbacks``. Does not
+    set step outputs or exit; see ``run_claude`` for that.
+    """
+    providers = [primary_provider()] + parse_provider_fallbacks(options.get("provider_fallbacks"))
+    
+    for index, provider in enumerate(providers):
+        if index > 0:
+            print(f"::warning::Failing over to provider {provider}")
+        attempt_kwargs = dict(
+            output_dir=output_dir,
+            label=label,
+            progress_comment=progress_comment,
+            provider=provider if index > 0 else None,
+            can_fail_over=index < len(providers) - 1,
+        )
+        result = await _execute_attempt(prompt_path, options, **attempt_kwargs)
+        if result.resume_failed:
+            # The stored session is gone by now, so this starts from the original prompt
+            print("::warning::Resuming the stored session failed, starting a fresh run")
+            result = await _execute_attempt(prompt_path, options, **attempt_kwargs)
+        result.provider = provider.name
+        if result.exit_code == 0 or not result.capacity_error:
+            break
+        print(f"::warning::Provider {provider} is out of capacity: {result.capacity_error}")
+    
+    return result
+
+
+async def _execute_attempt(
+    prompt_path: str,
+    options: Dict[str, Optional[str]],
+    output_dir: Optional[str] = None,
+    label: Optional[str] = None,
+    progress_comment: bool = True,
+    provider: Optional[Provider] = None,
+    can_fail_over: bool = False,
+) -> ClaudeRunResult:
+    """Run the Claude CLI once, optionally against an overriding provider."""
     claude_options = ClaudeOptions(**{k: v for k, v in options.items() if v is not None})
+    
+    # Continue a session left unfinished by a timed-out run of the same prompt
+    session_store = None
+    resume_state = None
+    resuming = False
+    task_digest = None
+    if claude_options.resume_state_dir:
+        session_store = SessionStore(
+            claude_options.resume_state_dir,
+            int(claude_options.max_resume_attempts or DEFAULT_MAX_RESUME_ATTEMPTS),
+        )
+        task_digest = prompt_digest(prompt_path)
+        resume_state = session_store.load(task_digest)
+        if resume_state is not None and not claude_options.resume:
+            print(
+                f"Resuming session {resume_state.session_id} "
+                f"(attempt {resume_state.attempts + 1} of {session_store.max_attempts})"
+            )
+            session_store.restore_transcript(resume_state.session_id)
+            claude_options.resume = resume_state.session_id
+            resuming = True
+            prompt_path = session_store.continue_prompt()
+    
     config = prepare_run_config(prompt_path, claude_options)
+    if provider is not None:
+        config.env.update(provider.env())
+    renderer = EventRenderer(claude_options.log_format or DEFAULT_LOG_FORMAT)
     
     # Set up paths
-    runner_temp = os.environ.get("RUNNER_TEMP", "/tmp")
-    execution_file = os.path.join(runner_temp, "claude-execution-output.json")
+    output_dir = output_dir or os.environ.get("RUNNER_TEMP", "/tmp")
+    execution_file = os.path.join(output_dir, "claude-execution-output.json")
+    metrics_file = os.path.join(output_dir, "claude-execution-metrics.json")
+    resource_report_file = os.path.join(output_dir, "claude-resource-report.json")
     
     # Log prompt file size
     try:
@@ -110,28 +305,72 @@ async def run_claude(prompt_path: str, options: Dict[str, Optional[str]]) -> Non
     except Exception:
         print("Prompt file size: unknown bytes")
     
+    # Secrets handed to Claude through claude_env or the MCP config are not
+    # known to the runner's masker; redact them from the log ourselves
+    redactor = get_redactor()
+    redactor.add(
+        secrets_from_custom_env(parse_custom_env_vars(claude_options.claude_env))
+        + secrets_from_mcp_config(claude_options.mcp_config)
+    )
+    
     # Log custom environment variables if any
     if config.env:
         env_keys = ", ".join(config.env.keys())
         print(f"Custom environment variables: {env_keys}")
     
+    # Opt-in result cache: replay a stored run with the same prompt,
+    # configuration and repository tree instead of executing again
+    result_cache = None
+    cache_key = None
+    if claude_options.result_cache_dir:
+        result_cache = ResultCache(claude_options.result_cache_dir)
+        try:
+            cache_key = result_cache.compute_key(
+                config.prompt_path,
+                config.claude_args,
+                config.env,
+                cwd=os.environ.get("GITHUB_WORKSPACE") or None,
+            )
+        except OSError as e:
+            print(f"::warning::Failed to compute result cache key: {e}")
+        if cache_key is None:
+            print("Result cache: run is not cacheable (no clean git checkout)")
+        elif entry := result_cache.restore(cache_key, execution_file, metrics_file):
+            print(f"Result cache hit ({cache_key[:12]}), replaying stored execution")
+            print(f"Log saved to {execution_file}")
+            return ClaudeRunResult(
+                exit_code=0,
+                execution_file=execution_file,
+                metrics=ExecutionMetrics(),
+                events=int(entry.get("events") or 0),
+                metrics_file=metrics_file,
+                cache_hit=True,
+                cached_outputs=entry.get("outputs") or {},
+            )
+        else:
+            print(f"Result cache miss ({cache_key[:12]})")
+    
     print(f"Running Claude with prompt from file: {config.prompt_path}")
     
+    # Prepare environment
+    process_env = os.environ.copy()
+    process_env.update(config.env)
+    
     # Debug environment variables
-    model = os.environ.get("ANTHROPIC_MODEL", "")
-    use_bedrock = os.environ.get("CLAUDE_CODE_USE_BEDROCK") == "1"
-    use_vertex = os.environ.get("CLAUDE_CODE_USE_VERTEX") == "1"
+    model = process_env.get("ANTHROPIC_MODEL", "")
+    use_bedrock = process_env.get("CLAUDE_CODE_USE_BEDROCK") == "1"
+    use_vertex = process_env.get("CLAUDE_CODE_USE_VERTEX") == "1"
     
     print(f"Model: {model}")
     print(f"Use Bedrock: {use_bedrock}")
     print(f"Use Vertex: {use_vertex}")
     
     if use_bedrock:
-        aws_region = os.environ.get("AWS_REGION", "")
-        aws_access_key_set = "Yes" if os.environ.get("AWS_ACCESS_KEY_ID") else "No"
-        aws_secret_key_set = "Yes" if os.environ.get("AWS_SECRET_ACCESS_KEY") else "No"
-        aws_session_token_set = "Yes" if os.environ.get("AWS_SESSION_TOKEN") else "No"
-        bedrock_base_url = os.environ.get("ANTHROPIC_BEDROCK_BASE_URL", "")
+        aws_region = process_env.get("AWS_REGION", "")
+        aws_access_key_set = "Yes" if process_env.get("AWS_ACCESS_KEY_ID") else "No"
+        aws_secret_key_set = "Yes" if process_env.get("AWS_SECRET_ACCESS_KEY") else "No"
+        aws_session_token_set = "Yes" if process_env.get("AWS_SESSION_TOKEN") else "No"
+        bedrock_base_url = process_env.get("ANTHROPIC_BEDROCK_BASE_URL", "")
         
         print(f"AWS Region: {aws_region}")
         print(f"AWS Access Key set: {aws_access_key_set}")
@@ -139,169 +378,284 @@ async def run_claude(prompt_path: str, options: Dict[str, Optional[str]]) -> Non
         print(f"AWS Session Token set: {aws_session_token_set}")
         print(f"Bedrock Base URL: {bedrock_base_url}")
     
-    # Prepare environment
-    process_env = os.environ.copy()
-    process_env.update(config.env)
-    
     # Create the full claude command with prompt file input
     claude_cmd = ["claude"] + config.claude_args + [config.prompt_path]
     
     print(f"Claude command: {' '.join(claude_cmd)}")
     
-    # Capture output
-    output = ""
+    # Stream events straight to the execution file as they arrive
+    execution_log = ExecutionLogWriter(execution_file)
+    metrics = ExecutionMetrics()
+    
+    # Keep only the tail of stderr in memory; optionally tee all of it to disk
+    stderr_buffer_kb = int(claude_options.stderr_buffer_kb or DEFAULT_STDERR_BUFFER_KB)
+    stderr_buffer = StderrRingBuffer(stderr_buffer_kb * 1024, claude_options.stderr_file or None)
+    # Spend limits are checked as usage arrives; exceeding one stops the run
+    budget = BudgetGovernor(
+        BudgetLimits.parse(
+            claude_options.max_input_tokens,
+            claude_options.max_output_tokens,
+            claude_options.max_cost_usd,
+        ),
+        metrics,
+    )
+    stop_requested = asyncio.Event()
+    stop_signal: Optional[int] = None
+    remove_signal_handler = None
+    capacity = CapacityErrorDetector()
+    result = ClaudeRunResult(
+        exit_code=1,
+        execution_file=execution_file,
+        metrics=metrics,
+        resumed_session_id=claude_options.resume,
+    )
+    
+    # Log rendering happens off the read loop through a buffered writer
+    console = BufferedConsole(prefix=f"[{label}] " if label else "")
+    
+    # Live progress in the tracking comment, rate limited by a debouncer
+    progress = None
+    progress_updater = None
+    progress_octokit = None
+    comment_id = os.environ.get("CLAUDE_COMMENT_ID")
+    repository = os.environ.get("GITHUB_REPOSITORY")
+    github_token = os.environ.get("GITHUB_TOKEN")
+    progress_enabled = (claude_options.progress_updates or "true").lower() == "true"
+    if progress_comment and progress_enabled and comment_id and repository and github_token:
+        github_server_url = os.environ.get("GITHUB_SERVER_URL", "https://github.com")
+        run_id = os.environ.get("GITHUB_RUN_ID")
+        progress = ProgressTracker(
+            claude_branch=os.environ.get("CLAUDE_BRANCH") or None,
+            job_link=f"{github_server_url}/{repository}/actions/runs/{run_id}" if run_id else None,
+        )
+        progress_octokit = create_octokit(github_token)
+        comment_endpoint = f"repos/{repository}/issues/comments/{comment_id}"
+        
+        async def send_progress(body: str) -> None:
+            await progress_octokit.rest.patch(comment_endpoint, {"body": body})
+        
+        progress_updater = DebouncedCommentUpdater(
+            send_progress,
+            float(claude_options.progress_update_interval or DEFAULT_PROGRESS_UPDATE_INTERVAL_SECONDS),
+        )
     
     try:
+        execution_log.open()
+        console.start()
+        if progress_updater is not None:
+            progress_updater.start()
+        
         # Claude process with direct file input
         claude_process = await asyncio.create_subprocess_exec(
             *claude_cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
-            env=process_env
+            env=process_env,
+            limit=STREAM_LINE_LIMIT,
+            **process_group_kwargs(),
         )
         
+        # In its own session Claude doesn't get the runner's SIGINT/SIGTERM
+        # when the job is cancelled; stop its process tree on them instead
+        def stop_on_signal(signum: int) -> None:
+            nonlocal stop_signal
+            stop_signal = signum
+            stop_requested.set()
+        
+        remove_signal_handler = on_termination_signal(stop_on_signal)
+        
         # Read output streaming
         async def read_output():
-            nonlocal output
             if claude_process.stdout:
                 async for line in claude_process.stdout:
                     text = line.decode()
+                    if not text.strip():
+                        continue
                     
-                    # Try to parse and pretty print JSON
-                    lines = text.split("\n")
-                    for i, line_text in enumerate(lines):
-                        if line_text.strip():
-                            try:
-                                parsed = json.loads(line_text)
-                                pretty_json = json.dumps(parsed, indent=2)
-                                print(pretty_json)
-                            except json.JSONDecodeError:
-                                print(line_text, end="")
-                        
-                        if i < len(lines) - 1 or text.endswith("\n"):
-                            print()
+                    try:
+                        event = json_codec.loads(text)
+                    except json_codec.JSONDecodeError:
+                        event = None
                     
-                    output += text
+                    if event is not None:
+                        execution_log.write_raw(redactor.redact(text))
+                        metrics.observe(event)
+                        if budget.limits.enabled and not stop_requested.is_set() and budget.check():
+                            stop_requested.set()
+                        capacity.observe(event)
+                        if can_fail_over and capacity.failover_eligible and not stop_requested.is_set():
+                            stop_requested.set()
+                        if progress is not None and not progress.comment_taken_over:
+                            progress.observe(event)
+                            if progress.comment_taken_over:
+                                progress_updater.disable()
+                            else:
+                                progress_updater.update(progress.render())
+                    console.write(renderer.render(text, event))
         
-        # Start reading output
+        # Sample CPU, memory and I/O of the process tree while it runs
+        sample_interval = float(
+            claude_options.resource_sample_interval or DEFAULT_SAMPLE_INTERVAL_SECONDS
+        )
+        resource_monitor = None
+        if sample_interval > 0 and ResourceMonitor.available():
+            resource_monitor = ResourceMonitor(claude_process.pid, sample_interval).start()
+        
+        # Start reading output; stderr is drained concurrently so a chatty
+        # child can never block on a full pipe
         output_task = asyncio.create_task(read_output())
+        stderr_task = None
+        if claude_process.stderr:
+            stderr_task = asyncio.create_task(drain_stream(claude_process.stderr, stderr_buffer))
         
         # Wait for Claude to finish with timeout
         timeout_minutes = int(os.environ.get("INPUT_TIMEOUT_MINUTES", "10"))
         timeout_seconds = timeout_minutes * 60
+        grace_seconds = float(claude_options.timeout_grace_seconds or DEFAULT_TIMEOUT_GRACE_SECONDS)
         
-        try:
-            exit_code = await asyncio.wait_for(claude_process.wait(), timeout=timeout_seconds)
-        except asyncio.TimeoutError:
-            print(f"Claude process timed out after {timeout_seconds} seconds")
-            claude_process.terminate()
-            await asyncio.sleep(5)  # Give it time to terminate gracefully
+        # Finish on exit, on a stop request from the event stream, or on timeout
+        process_wait = asyncio.create_task(wait_for_exit(claude_process))
+        stop_wait = asyncio.create_task(stop_requested.wait())
+        done, _ = await asyncio.wait(
+            {process_wait, stop_wait},
+            timeout=timeout_seconds,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        stop_wait.cancel()
+        
+        if process_wait in done:
+            exit_code = process_wait.result()
+            # MCP servers or tool subprocesses may outlive the CLI and hold the pipes open
+            await reap_orphans(claude_process, grace_seconds)
+        else:
+            process_wait.cancel()
+            if stop_signal is not None:
+                console.write(f"Received {signal.Signals(stop_signal).name}, stopping Claude\n")
+                exit_code = 128 + stop_signal
+            elif budget.exceeded:
+                console.write(f"Budget exceeded ({budget.exceeded}), stopping Claude\n")
+                exit_code = BUDGET_EXCEEDED_EXIT_CODE
+            elif capacity.failover_eligible:
+                console.write("Provider capacity error before any edits, stopping Claude\n")
+                exit_code = 1
+            else:
+                console.write(f"Claude process timed out after {timeout_seconds} seconds\n")
+                exit_code = 124  # Standard timeout exit code
+            # Stop the CLI and every process it spawned, escalating to SIGKILL
+            await terminate_process_tree(claude_process, grace_seconds)
+        
+        result.exit_code = exit_code
+        result.budget_exceeded = budget.exceeded if exit_code == BUDGET_EXCEEDED_EXIT_CODE else None
+        
+        if resource_monitor is not None:
+            result.resource_report = await resource_monitor.stop()
             try:
-                claude_process.kill()
-            except ProcessLookupError:
-                pass
-            exit_code = 124  # Standard timeout exit code
+                resource_monitor.write(resource_report_file)
+                result.resource_report_file = resource_report_file
+            except Exception as e:
+                print(f"::warning::Failed to write resource report: {e}")
         
-        # Capture stderr for debugging
-        if claude_process.stderr:
-            stderr_output = await claude_process.stderr.read()
-            if stderr_output:
-                stderr_text = stderr_output.decode()
+        # Wait for stdout and stderr readers to complete
+        for task in (output_task, stderr_task):
+            if task is None:
+                continue
+            try:
+                await asyncio.wait_for(task, timeout=5)
+            except asyncio.TimeoutError:
+                task.cancel()
+        stderr_buffer.close()
+        await console.aclose()
+        if progress_updater is not None:
+            await progress_updater.aclose()
+            print(
+                f"Progress comment updates sent: {progress_updater.requests_sent} "
+                f"(coalesced {progress_updater.updates_skipped})"
+            )
+        
+        # Report stderr for debugging
+        stderr_text = stderr_buffer.text()
+        if exit_code != 0:
+            capacity.observe_stderr(stderr_text)
+            if capacity.failover_eligible:
+                result.capacity_error = capacity.capacity_error
+        if stderr_text:
+            if stderr_buffer.truncated:
+                print(f"Claude stderr (last {stderr_buffer_kb} KB of {stderr_buffer.total_bytes} bytes):")
+                print(stderr_text)
+            else:
                 print(f"Claude stderr: {stderr_text}")
-                if exit_code != 0:
-                    error_msg = f"Claude failed with exit code {exit_code}: {stderr_text}"
-                    print(f"::error::{error_msg}")
-                    
-                    # Add specific guidance for common Bedrock issues
-                    if use_bedrock and "404" in stderr_text:
-                        print("::error::Bedrock 404 troubleshooting:")
-                        print("::error::1. Ensure the model is enabled in AWS Bedrock console")
-                        print("::error::2. Verify AWS credentials have bedrock:InvokeModel permission")
-                        print(f"::error::3. Check if model '{model}' is available in region '{aws_region}'")
+            if claude_options.stderr_file:
+                print(f"Full stderr saved to {claude_options.stderr_file}")
+            if exit_code != 0:
+                error_msg = f"Claude failed with exit code {exit_code}: {stderr_text}"
+                print(f"::error::{error_msg}")
+                
+                # Add specific guidance for common Bedrock issues
+                if use_bedrock and "404" in stderr_text:
+                    print("::error::Bedrock 404 troubleshooting:")
+                    print("::error::1. Ensure the model is enabled in AWS Bedrock console")
+                    print("::error::2. Verify AWS credentials have bedrock:InvokeModel permission")
+                    print(f"::error::3. Check if model '{model}' is available in region '{aws_region}'")
         
-        # Wait for output reading to complete
+        execution_log.close()
+        result.events = execution_log.count
+        print(f"Log saved to {execution_file}")
+        
+        # Record execution metrics
+        metrics.finish()
         try:
-            await asyncio.wait_for(output_task, timeout=5)
-        except asyncio.TimeoutError:
-            pass
+            metrics.write(metrics_file)
+            result.metrics_file = metrics_file
+            print(f"Metrics saved to {metrics_file}")
+        except Exception as e:
+            print(f"::warning::Failed to write execution metrics: {e}")
         
-        # Set conclusion based on exit code
-        if exit_code == 0:
-            try:
-                # Process output and save execution metrics
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-                    temp_file.write(output)
-                    temp_file_path = temp_file.name
-                
-                # Use jq to process output into JSON array
-                result = subprocess.run(
-                    ["jq", "-s", ".", temp_file_path],
-                    capture_output=True,
-                    text=True,
-                    check=True
+        if session_store is not None:
+            if exit_code == 124 and metrics.session_id:
+                state = session_store.save(
+                    metrics.session_id, task_digest, execution_file, resume_state
                 )
-                
-                async with aiofiles.open(execution_file, 'w') as f:
-                    await f.write(result.stdout)
-                
-                print(f"Log saved to {execution_file}")
-                os.unlink(temp_file_path)
-                
-            except Exception as e:
-                print(f"::warning::Failed to process output for execution metrics: {e}")
-            
-            # Set GitHub Actions outputs
-            if github_output := os.environ.get("GITHUB_OUTPUT"):
-                with open(github_output, "a") as f:
-                    f.write(f"conclusion=success\n")
-                    f.write(f"execution_file={execution_file}\n")
-            else:
-                print(f"::set-output name=conclusion::success")
-                print(f"::set-output name=execution_file::{execution_file}")
-        else:
-            # Set GitHub Actions outputs for failure
-            if github_output := os.environ.get("GITHUB_OUTPUT"):
-                with open(github_output, "a") as f:
-                    f.write(f"conclusion=failure\n")
-            else:
-                print(f"::set-output name=conclusion::failure")
-            
-            # Still try to save execution file if we have output
-            if output:
-                try:
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as temp_file:
-                        temp_file.write(output)
-                        temp_file_path = temp_file.name
-                    
-                    result = subprocess.run(
-                        ["jq", "-s", ".", temp_file_path],
-                        capture_output=True,
-                        text=True,
-                        check=True
-                    )
-                    
-                    async with aiofiles.open(execution_file, 'w') as f:
-                        await f.write(result.stdout)
-                    
-                    # Set execution file output
-                    if github_output := os.environ.get("GITHUB_OUTPUT"):
-                        with open(github_output, "a") as f:
-                            f.write(f"execution_file={execution_file}\n")
-                    else:
-                        print(f"::set-output name=execution_file::{execution_file}")
-                    os.unlink(temp_file_path)
-                    
-                except Exception:
-                    pass  # Ignore errors when processing output during failure
-            
-            sys.exit(exit_code)
-            
+                print(
+                    f"Saved session {state.session_id} to {claude_options.resume_state_dir}; "
+                    f"the next run of this prompt will resume it"
+                )
+            elif exit_code == 0:
+                session_store.clear(task_digest)
+            elif resuming and not result.budget_exceeded and not result.capacity_error:
+                # Don't retry a broken resume (e.g. a lost transcript) on every
+                # later run; if it failed before producing any output, fall
+                # back to a fresh run right away
+                session_store.clear(task_digest)
+                print(f"Dropped stored session {resume_state.session_id} after the resumed run failed")
+                result.resume_failed = execution_log.count == 0
+        
+        if result_cache is not None and cache_key is not None and exit_code == 0:
+            result_cache.store(
+                cache_key, execution_file, result.metrics_file, result.outputs(), result.events
+            )
+        
     except Exception as e:
+        await console.aclose()
         print(f"::error::Failed to run Claude: {e}")
-        # Set GitHub Actions outputs for failure
-        if github_output := os.environ.get("GITHUB_OUTPUT"):
-            with open(github_output, "a") as f:
-                f.write(f"conclusion=failure\n")
-        else:
-            print(f"::set-output name=conclusion::failure")
-        sys.exit(1)
\ No newline at end of file
+        result.exit_code = 1
+        result.error = str(e)
+    finally:
+        if remove_signal_handler is not None:
+            remove_signal_handler()
+        execution_log.close()
+        stderr_buffer.close()
+        if progress_octokit is not None:
+            await progress_octokit.close()
+    
+    return result
+
+
+async def run_claude(prompt_path: str, options: Dict[str, Optional[str]]) -> None:
+    """Run Claude with the specified configuration."""
+    result = await execute_claude(prompt_path, options)
+    
+    for name, value in result.outputs().items():
+        set_output(name, value)
+    
+    if result.exit_code != 0:
+        sys.exit(result.exit_code)
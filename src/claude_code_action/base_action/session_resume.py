@@ -0,0 +1,146 @@
+"""Persist Claude sessions of timed-out runs so a later run can resume them."""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from .setup_claude_code_settings import get_claude_config_home_dir
+
+DEFAULT_MAX_RESUME_ATTEMPTS = 3
+
+STATE_FILE = "session.json"
+TRANSCRIPTS_DIR = "transcripts"
+PARTIAL_LOGS_DIR = "partial-logs"
+CONTINUE_PROMPT_FILE = "continue-prompt.txt"
+
+CONTINUE_PROMPT = (
+    "Your previous run on this task was stopped by the timeout before it finished. "
+    "Continue the task from where you left off. Do not repeat work that is already done."
+)
+
+
+@dataclass
+class ResumeState:
+    """A session left unfinished by a timed-out run."""
+    session_id: str
+    prompt_sha256: str
+    attempts: int = 1
+    updated_at: int = 0
+    partial_logs: List[str] = field(default_factory=list)
+
+
+def prompt_digest(prompt_path: str) -> str:
+    """Identify the task by the content of its prompt file."""
+    with open(prompt_path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class SessionStore:
+    """
+    Keep the resumable session of a task in a directory.
+
+    The directory holds the state file, the session transcript copied out
+    of the Claude config directory, and the partial execution logs of every
+    interrupted attempt. Persist it between runs (e.g. with actions/cache)
+    to resume on a different runner.
+    """
+
+    def __init__(self, directory: str, max_attempts: int = DEFAULT_MAX_RESUME_ATTEMPTS):
+        self.directory = Path(directory)
+        self.max_attempts = max_attempts
+
+    @property
+    def state_file(self) -> Path:
+        return self.directory / STATE_FILE
+
+    def _read_state(self) -> Optional[ResumeState]:
+        try:
+            with open(self.state_file) as f:
+                return ResumeState(**json.load(f))
+        except (OSError, TypeError, json.JSONDecodeError):
+            return None
+
+    def load(self, prompt_sha256: str) -> Optional[ResumeState]:
+        """Return the resumable session for this prompt, if any."""
+        state = self._read_state()
+        if state is None:
+            return None
+
+        if state.prompt_sha256 != prompt_sha256:
+            print("Stored session belongs to a different prompt, starting fresh")
+            return None
+        if state.attempts >= self.max_attempts:
+            print(f"Session {state.session_id} was already resumed {state.attempts} times, starting fresh")
+            return None
+        return state
+
+    def continue_prompt(self) -> str:
+        """Write and return the prompt file used to continue a session."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / CONTINUE_PROMPT_FILE
+        path.write_text(CONTINUE_PROMPT)
+        return str(path)
+
+    def save(
+        self,
+        session_id: str,
+        prompt_sha256: str,
+        execution_file: str,
+        previous: Optional[ResumeState] = None,
+    ) -> ResumeState:
+        """Record an interrupted session together with its partial log."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = ResumeState(
+            session_id=session_id,
+            prompt_sha256=prompt_sha256,
+            attempts=previous.attempts + 1 if previous else 1,
+            updated_at=int(time.time()),
+            partial_logs=list(previous.partial_logs) if previous else [],
+        )
+
+        if os.path.exists(execution_file):
+            logs_dir = self.directory / PARTIAL_LOGS_DIR
+            logs_dir.mkdir(exist_ok=True)
+            partial_log = logs_dir / f"attempt-{state.attempts}.json"
+            shutil.copyfile(execution_file, partial_log)
+            state.partial_logs.append(str(partial_log))
+
+        self._save_transcript(session_id)
+
+        tmp_file = self.state_file.with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(asdict(state), f, indent=2)
+        os.replace(tmp_file, self.state_file)
+        return state
+
+    def clear(self, prompt_sha256: str) -> bool:
+        """
+        Forget the stored session of this prompt, e.g. once its task has
+        completed. A session stored for a different prompt is kept.
+        """
+        state = self._read_state()
+        if state is None or state.prompt_sha256 != prompt_sha256:
+            return False
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return True
+
+    def _save_transcript(self, session_id: str) -> None:
+        projects_dir = Path(get_claude_config_home_dir()) / "projects"
+        for transcript in projects_dir.glob(f"*/{session_id}.jsonl"):
+            target = self.directory / TRANSCRIPTS_DIR / transcript.parent.name / transcript.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(transcript, target)
+
+    def restore_transcript(self, session_id: str) -> None:
+        """Put the saved transcript back where the CLI looks for it."""
+        projects_dir = Path(get_claude_config_home_dir()) / "projects"
+        for saved in (self.directory / TRANSCRIPTS_DIR).glob(f"*/{session_id}.jsonl"):
+            target = projects_dir / saved.parent.name / saved.name
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(saved, target)
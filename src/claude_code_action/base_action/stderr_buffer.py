@@ -0,0 +1,81 @@
+"""Bounded capture of the Claude process stderr stream."""
+
+import asyncio
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Deque, Optional
+
+DEFAULT_STDERR_BUFFER_KB = 64
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class StderrRingBuffer:
+    """
+    Keep the last ``max_bytes`` of a stream in memory.
+
+    Optionally tees every chunk to ``tee_path`` so the full stream is still
+    available on disk while memory stays fixed.
+    """
+
+    def __init__(self, max_bytes: int, tee_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.tee_path = tee_path
+        self.total_bytes = 0
+        self._chunks: Deque[bytes] = deque()
+        self._size = 0
+        self._tee: Optional[BinaryIO] = None
+
+        if tee_path:
+            Path(tee_path).parent.mkdir(parents=True, exist_ok=True)
+            self._tee = open(tee_path, "wb")
+
+    @property
+    def truncated(self) -> bool:
+        """Whether older output has been dropped from the buffer."""
+        return self.total_bytes > self._size
+
+    def feed(self, chunk: bytes) -> None:
+        """Append a chunk, dropping the oldest data beyond the limit."""
+        if not chunk:
+            return
+
+        self.total_bytes += len(chunk)
+        if self._tee is not None:
+            self._tee.write(chunk)
+
+        if len(chunk) >= self.max_bytes:
+            self._chunks.clear()
+            chunk = chunk[-self.max_bytes:] if self.max_bytes > 0 else b""
+            self._size = 0
+
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+
+        while self._size > self.max_bytes and self._chunks:
+            overflow = self._size - self.max_bytes
+            head = self._chunks[0]
+            if len(head) <= overflow:
+                self._chunks.popleft()
+                self._size -= len(head)
+            else:
+                self._chunks[0] = head[overflow:]
+                self._size -= overflow
+
+    def text(self) -> str:
+        """Return the buffered tail as text."""
+        return b"".join(self._chunks).decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        """Close the tee file, if any."""
+        if self._tee is not None:
+            self._tee.close()
+            self._tee = None
+
+
+async def drain_stream(reader: asyncio.StreamReader, buffer: StderrRingBuffer) -> None:
+    """Read ``reader`` until EOF so the child never blocks on a full pipe."""
+    while True:
+        chunk = await reader.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.feed(chunk)
@@ -1,29 +1,19 @@
 import os
 from typing import List
 
+from .providers import parse_provider_fallbacks
 
-def validate_environment_variables() -> None:
-    """
-    Validates the environment variables required for running Claude Code
-    based on the selected provider (Anthropic API, AWS Bedrock, or Google Vertex AI)
-    """
-    use_bedrock = os.environ.get("CLAUDE_CODE_USE_BEDROCK") == "1"
-    use_vertex = os.environ.get("CLAUDE_CODE_USE_VERTEX") == "1"
-    anthropic_api_key = os.environ.get("ANTHROPIC_API_KEY")
-    
+
+def validate_provider_environment(provider: str) -> List[str]:
+    """Return the missing environment variables for a provider."""
     errors: List[str] = []
     
-    if use_bedrock and use_vertex:
-        errors.append(
-            "Cannot use both Bedrock and Vertex AI simultaneously. Please set only one provider."
-        )
-    
-    if not use_bedrock and not use_vertex:
-        if not anthropic_api_key:
+    if provider == "anthropic":
+        if not os.environ.get("ANTHROPIC_API_KEY"):
             errors.append(
                 "ANTHROPIC_API_KEY is required when using direct Anthropic API."
             )
-    elif use_bedrock:
+    elif provider == "bedrock":
         required_bedrock_vars = {
             "AWS_REGION": os.environ.get("AWS_REGION"),
             "AWS_ACCESS_KEY_ID": os.environ.get("AWS_ACCESS_KEY_ID"),
@@ -34,7 +24,7 @@ def validate_environment_variables() -> None:
             if not value:
                 errors.append(f"{key} is required when using AWS Bedrock.")
     
-    elif use_vertex:
+    elif provider == "vertex":
         required_vertex_vars = {
             "ANTHROPIC_VERTEX_PROJECT_ID": os.environ.get("ANTHROPIC_VERTEX_PROJECT_ID"),
             "CLOUD_ML_REGION": os.environ.get("CLOUD_ML_REGION"),
@@ -44,6 +34,43 @@ def validate_environment_variables() -> None:
             if not value:
                 errors.append(f"{key} is required when using Google Vertex AI.")
     
+    return errors
+
+
+def validate_environment_variables() -> None:
+    """
+    Validates the environment variables required for running Claude Code
+    based on the selected provider (Anthropic API, AWS Bedrock, or Google Vertex AI)
+    and on every provider listed in INPUT_PROVIDER_FALLBACKS
+    """
+    use_bedrock = os.environ.get("CLAUDE_CODE_USE_BEDROCK") == "1"
+    use_vertex = os.environ.get("CLAUDE_CODE_USE_VERTEX") == "1"
+    
+    errors: List[str] = []
+    
+    if use_bedrock and use_vertex:
+        errors.append(
+            "Cannot use both Bedrock and Vertex AI simultaneously. Please set only one provider."
+        )
+    elif use_bedrock:
+        errors.extend(validate_provider_environment("bedrock"))
+    elif use_vertex:
+        errors.extend(validate_provider_environment("vertex"))
+    else:
+        errors.extend(validate_provider_environment("anthropic"))
+    
+    try:
+        fallbacks = parse_provider_fallbacks(os.environ.get("INPUT_PROVIDER_FALLBACKS"))
+    except ValueError as e:
+        errors.append(str(e))
+        fallbacks = []
+    
+    for provider in fallbacks:
+        for error in validate_provider_environment(provider.name):
+            message = f"{error} (fallback provider)"
+            if message not in errors:
+                errors.append(message)
+    
     if errors:
         error_message = "Environment variable validation failed:\n" + "\n".join(f"  - {e}" for e in errors)
-        raise RuntimeError(error_message)
\ No newline at end of file
+        raise RuntimeError(error_message)
@@ -8,6 +8,7 @@ import os
 import sys
 from typing import Optional
 
+from ..base_action.redact import install_redactor, mask_secret
 from ..github.token import setup_github_token
 from ..github.validation.trigger import check_trigger_action
 from ..github.validation.actor import check_human_actor
@@ -18,6 +19,9 @@ from ..github.operations.comments.update_with_branch import update_tracking_comm
 from ..mcp.install_mcp_server import prepare_mcp_config
 from ..create_prompt import create_prompt
 from ..github.api.client import create_octokit
+from ..github.api.metrics import write_api_metrics
+from ..github.api.rate_limit import log_rate_limiter_stats
+from ..github.api.session import close_shared_session
 from ..github.data.fetcher import fetch_github_data
 from ..github.context import parse_github_context
 
@@ -49,9 +53,12 @@ def export_variable(name: str, value: str) -> None:
 
 async def run() -> None:
     """Main execution logic."""
+    install_redactor()
     try:
         # Step 1: Setup GitHub token
         github_token = await setup_github_token()
+        # An exchanged app token is unknown to the runner's masker
+        mask_secret(github_token)
         octokit = create_octokit(github_token)
 
         # Step 2: Parse GitHub context (once for all operations)
@@ -126,9 +133,6 @@ async def run() -> None:
             allowed_tools=context.inputs.allowed_tools,
         )
         set_output("mcp_config", mcp_config)
-        
-        # Clean up the session
-        await octokit.close()
 
     except Exception as error:
         error_message = str(error)
@@ -136,6 +140,11 @@ async def run() -> None:
         # Also output the clean error message for the action to capture
         set_output("prepare_error", error_message)
         sys.exit(1)
+    finally:
+        log_rate_limiter_stats()
+        write_api_metrics("prepare")
+        # Close the pooled connections shared by every GitHub request
+        await close_shared_session()
 
 
 def main() -> None:
@@ -5,7 +5,11 @@ import os
 import sys
 from typing import Optional
 
+from ..base_action.redact import install_redactor
 from ..github.api.client import create_octokit
+from ..github.api.metrics import write_api_metrics
+from ..github.api.rate_limit import log_rate_limiter_stats
+from ..github.api.session import close_shared_session
 from ..github.context import parse_github_context
 
 
@@ -17,6 +21,7 @@ def set_failed(message: str) -> None:
 
 async def run() -> None:
     """Main execution logic."""
+    install_redactor()
     try:
         # Get required environment variables
         repository = os.environ.get("REPOSITORY")
@@ -69,14 +74,16 @@ async def run() -> None:
         await octokit.rest.patch(endpoint, {"body": comment_body})
 
         print("Comment updated successfully")
-        
-        # Clean up the session
-        await octokit.close()
 
     except Exception as error:
         error_message = str(error)
         set_failed(f"Update comment failed with error: {error_message}")
         sys.exit(1)
+    finally:
+        log_rate_limiter_stats()
+        write_api_metrics("update-comment-link")
+        # Close the pooled connections shared by every GitHub request
+        await close_shared_session()
 
 
 def main() -> None:
@@ -0,0 +1,254 @@
+"""Record and replay GitHub HTTP traffic through a cassette file."""
+
+import abc
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional
+from urllib.parse import urlencode
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from ... import json_codec
+from ...base_action.redact import REDACTED, Redactor, is_sensitive_name
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay")
+
+# Response headers that never help a replay and may identify a session
+DROPPED_HEADERS = frozenset({"set-cookie", "date", "x-github-request-id", "content-encoding", "content-length"})
+
+
+class CassetteMiss(LookupError):
+    """A replayed request has no (remaining) recorded response."""
+
+
+def request_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None, body: Any = None) -> str:
+    """Identify a request by method, URL, sorted query and canonical JSON body."""
+    if params:
+        url = f"{url}?{urlencode(sorted((k, str(v)) for k, v in dict(params).items()))}"
+    key = f"{method.upper()} {url}"
+    if body is not None:
+        key += " " + json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return key
+
+
+class CassetteResponse:
+    """A fully read response, as returned by both recording and replay."""
+
+    def __init__(self, method: str, url: str, status: int, headers: Mapping[str, str], body: bytes):
+        self.method = method
+        self.url = URL(url)
+        self.status = status
+        self.reason = ""
+        self.headers = CIMultiDictProxy(CIMultiDict(headers))
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._body.decode(encoding, errors="replace")
+
+    async def json(self, **kwargs) -> Any:
+        return json_codec.loads(self._body) if self._body.strip() else None
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            request_info = aiohttp.RequestInfo(self.url, self.method, CIMultiDictProxy(CIMultiDict()), self.url)
+            raise aiohttp.ClientResponseError(
+                request_info, (), status=self.status, message=self.reason, headers=self.headers
+            )
+
+
+class _ResponseContext:
+    """Async context manager around a coroutine producing a response."""
+
+    def __init__(self, make: Callable[[], Awaitable[CassetteResponse]]):
+        self._make = make
+
+    async def __aenter__(self) -> CassetteResponse:
+        return await self._make()
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+
+class _CassetteSession(abc.ABC):
+    """The slice of ``aiohttp.ClientSession`` the GitHub clients use."""
+
+    closed = False
+
+    def request(self, method: str, url: str, **kwargs) -> _ResponseContext:
+        return _ResponseContext(lambda: self._request(method, str(url), **kwargs))
+
+    def get(self, url: str, **kwargs) -> _ResponseContext:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> _ResponseContext:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> _ResponseContext:
+        return self.request("PATCH", url, **kwargs)
+
+    @abc.abstractmethod
+    async def _request(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        """Produce the fully read response to a request."""
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class RecordingSession(_CassetteSession):
+    """
+    Send requests through a real session and record every exchange.
+
+    Bearer tokens seen in requests, token-shaped strings and sensitive
+    headers are scrubbed before anything is written. The cassette is saved
+    when the session is closed.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, path: str):
+        self.session = session
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self.redactor = Redactor()
+
+    def _scrub_headers(self, headers: Mapping[str, str]) -> Dict[str, str]:
+        scrubbed = {}
+        for name, value in headers.items():
+            if name.lower() in DROPPED_HEADERS:
+                continue
+            scrubbed[name] = REDACTED if is_sensitive_name(name.replace("-", "_")) else self.redactor.redact(value)
+        return scrubbed
+
+    async def _request(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        if authorization.startswith(("Bearer ", "token ")):
+            self.redactor.add([authorization.split(" ", 1)[1]])
+
+        started = time.monotonic()
+        async with self.session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            status, headers = response.status, response.headers
+        elapsed = time.monotonic() - started
+
+        text = body.decode("utf-8", errors="replace")
+        request_body = kwargs.get("json")
+        self.interactions.append({
+            "key": self.redactor.redact(request_key(method, url, kwargs.get("params"), request_body)),
+            "status": status,
+            "headers": self._scrub_headers(headers),
+            "body": self.redactor.redact(text),
+            "elapsed_ms": round(elapsed * 1000, 1),
+        })
+        return CassetteResponse(method, url, status, headers, body)
+
+    def save(self) -> None:
+        """Write the cassette atomically, scrubbing tokens learned late."""
+        for interaction in self.interactions:
+            interaction["key"] = self.redactor.redact(interaction["key"])
+            interaction["body"] = self.redactor.redact(interaction["body"])
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": CASSETTE_VERSION, "interactions": self.interactions}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        print(f"Recorded {len(self.interactions)} GitHub API interactions to {self.path}")
+
+    async def close(self) -> None:
+        await super().close()
+        try:
+            self.save()
+        finally:
+            await self.session.close()
+
+
+class ReplaySession(_CassetteSession):
+    """
+    Answer requests from a cassette without touching the network.
+
+    Identical requests get their recorded responses in recorded order. Each
+    response is delayed by ``latency`` seconds, or by its recorded duration
+    if ``recorded_latency`` is set.
+    """
+
+    def __init__(self, path: str, latency: float = 0.0, recorded_latency: bool = False):
+        with open(path) as f:
+            cassette = json.load(f)
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}: {cassette.get('version')}")
+
+        self.path = path
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self.replayed = 0
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        for interaction in cassette["interactions"]:
+            self._queues[interaction["key"]].append(interaction)
+        # Requests are recorded with real tokens; match them scrubbed too
+        self.redactor = Redactor()
+
+    async def _request(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        if authorization.startswith(("Bearer ", "token ")) and authorization.split(" ", 1)[1] != REDACTED:
+            self.redactor.add([authorization.split(" ", 1)[1]])
+
+        key = self.redactor.redact(request_key(method, url, kwargs.get("params"), kwargs.get("json")))
+        queue = self._queues.get(key)
+        if not queue:
+            raise CassetteMiss(f"No recorded response left in {self.path} for {key[:300]}")
+        interaction = queue.popleft()
+
+        delay = self.latency
+        if self.recorded_latency:
+            delay = interaction.get("elapsed_ms", 0) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+
+        self.replayed += 1
+        return CassetteResponse(method, url, interaction["status"], interaction["headers"], interaction["body"].encode())
+
+    @property
+    def unused(self) -> int:
+        """Recorded interactions that were never replayed."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def close(self) -> None:
+        await super().close()
+        print(f"Replayed {self.replayed} GitHub API interactions from {self.path}, {self.unused} unused")
+
+
+def cassette_from_environment(
+    create_session: Callable[[], aiohttp.ClientSession],
+) -> Optional[_CassetteSession]:
+    """
+    The cassette session configured by CLAUDE_GITHUB_API_CASSETTE, if any.
+
+    CLAUDE_GITHUB_API_CASSETTE_MODE is ``record`` or ``replay`` (default); for
+    replay, CLAUDE_GITHUB_API_REPLAY_LATENCY_MS adds a fixed delay per response, or
+    ``recorded`` replays each response after its recorded duration.
+    """
+    path = os.environ.get("CLAUDE_GITHUB_API_CASSETTE")
+    if not path:
+        return None
+    mode = os.environ.get("CLAUDE_GITHUB_API_CASSETTE_MODE") or "replay"
+    if mode not in MODES:
+        raise ValueError(f"CLAUDE_GITHUB_API_CASSETTE_MODE must be one of {', '.join(MODES)}, got: {mode}")
+    if mode == "record":
+        return RecordingSession(create_session(), path)
+
+    latency = os.environ.get("CLAUDE_GITHUB_API_REPLAY_LATENCY_MS") or "0"
+    if latency == "recorded":
+        return ReplaySession(path, recorded_latency=True)
+    try:
+        latency_seconds = float(latency) / 1000
+    except ValueError:
+        raise ValueError(f"CLAUDE_GITHUB_API_REPLAY_LATENCY_MS must be a number or 'recorded', got: {latency}")
+    return ReplaySession(path, latency=latency_seconds)
@@ -1,9 +1,72 @@
 """GitHub API client wrapper."""
 
+import asyncio
+import time
 import aiohttp
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, AsyncIterator, Mapping, Optional
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+from ... import json_codec
 from .config import GITHUB_API_URL, GITHUB_GRAPHQL_URL
+from .graphql_batch import GraphQLBatcher
+from .metrics import get_api_metrics
+from .pagination import DEFAULT_PER_PAGE, DEFAULT_PREFETCH_WINDOW, paginate
+from .rate_limit import MAX_RATE_LIMIT_RETRIES, MAX_WAIT_SECONDS, RateLimiter, get_shared_rate_limiter
+from .response_cache import ResponseCache, token_scope
+from .retry import IDEMPOTENT_METHODS, RetryPolicy
+from .session import get_shared_session
+
+
+@dataclass
+class ApiResponse:
+    """Status, headers and decoded body of a GitHub API response."""
+    status: int
+    headers: Mapping[str, str]
+    data: Any
+
+
+async def _send(
+    session: aiohttp.ClientSession,
+    limiter: Optional[RateLimiter],
+    resource: str,
+    method: str,
+    url: str,
+    **kwargs,
+) -> ApiResponse:
+    """
+    Send a request through the rate limiter.
+
+    Rate limited responses are waited out and retried, since GitHub rejects
+    them before doing any work; other errors raise ``ClientResponseError``.
+    Every attempt is recorded in the shared API metrics.
+    """
+    metrics = get_api_metrics()
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        if limiter is not None:
+            await limiter.acquire(resource)
+
+        started = time.monotonic()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.read()
+                metrics.record(method, url, response.status, len(body), time.monotonic() - started, response.headers)
+
+                if limiter is not None:
+                    limiter.observe(resource, response.headers)
+                    if response.status in (403, 429) and attempt < MAX_RATE_LIMIT_RETRIES:
+                        delay = limiter.retry_delay(response.status, response.headers, await response.text())
+                        if delay is not None and delay <= MAX_WAIT_SECONDS:
+                            print(f"GitHub API rate limit hit ({method} {url}), retrying in {delay:.0f}s")
+                            continue
+
+                response.raise_for_status()
+                data = json_codec.loads(body) if body.strip() and response.status != 304 else None
+                return ApiResponse(response.status, response.headers, data)
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+            metrics.record(method, url, None, 0, time.monotonic() - started)
+            raise
+
+    raise RuntimeError("unreachable")
 
 
 @dataclass
@@ -11,45 +74,91 @@ class RestClient:
     """REST API client."""
     session: aiohttp.ClientSession
     token: str
-    
-    async def get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """GET request."""
-        url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
-        headers = {
+    cache: Optional[ResponseCache] = None
+    limiter: Optional[RateLimiter] = None
+    policy: Optional[RetryPolicy] = None
+
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
-        
-        async with self.session.get(url, headers=headers, **kwargs) as response:
-            response.raise_for_status()
-            return await response.json()
-    
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> ApiResponse:
+        """
+        Send a request and return status, headers and body.
+
+        Idempotent requests follow the retry policy (deadline, retries and
+        hedging); POST and PATCH are sent exactly once.
+        """
+        if endpoint.startswith(("https://", "http://")):
+            # Absolute URLs come from Link headers
+            url = endpoint
+        else:
+            url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
+        headers = self._headers()
+        headers.update(kwargs.pop("headers", None) or {})
+
+        if self.policy is None or method.upper() not in IDEMPOTENT_METHODS:
+            return await _send(self.session, self.limiter, "core", method, url, headers=headers, **kwargs)
+
+        kwargs.setdefault("timeout", self.policy.timeout())
+        return await self.policy.run(
+            lambda: _send(self.session, self.limiter, "core", method, url, headers=headers, **kwargs),
+            f"{method} {url}",
+        )
+
+    async def get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """GET request, revalidated against the response cache if configured."""
+        if self.cache is None:
+            return (await self.request("GET", endpoint, **kwargs)).data
+
+        url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
+        if params := kwargs.get("params"):
+            url = f"{url}?{urlencode(sorted(dict(params).items()))}"
+        scope = token_scope(self.token)
+        cached = self.cache.lookup(url, scope)
+
+        response = await self.request(
+            "GET", endpoint, headers=self.cache.conditional_headers(cached), **kwargs
+        )
+        # A 304 does not count against the rate limit
+        if response.status == 304 and cached is not None:
+            return self.cache.revalidated(url, scope, cached)
+        self.cache.store(
+            url,
+            scope,
+            response.data,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return response.data
+
+    def paginate(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        per_page: int = DEFAULT_PER_PAGE,
+        window: int = DEFAULT_PREFETCH_WINDOW,
+        items_key: Optional[str] = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over every item of a list endpoint, prefetching up to
+        ``window`` pages concurrently; see ``pagination.paginate``.
+
+            async for comment in rest.paginate(f"repos/{repo}/issues/{number}/comments"):
+                ...
+        """
+        return paginate(self, endpoint, params, per_page, window, items_key)
+
     async def post(self, endpoint: str, json_data: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
         """POST request."""
-        url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
-        async with self.session.post(url, headers=headers, json=json_data, **kwargs) as response:
-            response.raise_for_status()
-            return await response.json()
-    
+        return (await self.request("POST", endpoint, json=json_data, **kwargs)).data
+
     async def patch(self, endpoint: str, json_data: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
         """PATCH request."""
-        url = f"{GITHUB_API_URL}/{endpoint.lstrip('/')}"
-        headers = {
-            "Authorization": f"Bearer {self.token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
-        
-        async with self.session.patch(url, headers=headers, json=json_data, **kwargs) as response:
-            response.raise_for_status()
-            return await response.json()
+        return (await self.request("PATCH", endpoint, json=json_data, **kwargs)).data
 
 
 @dataclass
@@ -57,21 +166,50 @@ class GraphQLClient:
     """GraphQL API client."""
     session: aiohttp.ClientSession
     token: str
-    
+    limiter: Optional[RateLimiter] = None
+    # Merge queries issued in the same event-loop tick into one request
+    batching: bool = False
+    batcher: Optional[GraphQLBatcher] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.batching:
+            self.batcher = GraphQLBatcher(self._execute)
+
     async def query(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Execute GraphQL query."""
+        """
+        Execute GraphQL query.
+
+        Selecting ``rateLimit { cost remaining resetAt }`` in the query lets
+        the rate limiter account for its point cost; batched queries report
+        the cost of their merged request automatically. Queries started
+        concurrently, e.g. with ``asyncio.gather``, share one request when
+        batching is enabled:
+
+            issue, pr = await asyncio.gather(
+                graphql.query(ISSUE_QUERY, {"number": 1}),
+                graphql.query(PR_QUERY, {"number": 2}),
+            )
+        """
+        if self.batcher is not None:
+            return await self.batcher.load(query, variables)
+        return await self._execute(query, variables)
+
+    async def _execute(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
-        
+
         payload = {"query": query}
         if variables:
             payload["variables"] = variables
-        
-        async with self.session.post(GITHUB_GRAPHQL_URL, headers=headers, json=payload) as response:
-            response.raise_for_status()
-            return await response.json()
+
+        response = await _send(
+            self.session, self.limiter, "graphql", "POST", GITHUB_GRAPHQL_URL, headers=headers, json=payload
+        )
+        if self.limiter is not None:
+            self.limiter.observe_graphql(response.data)
+        return response.data
 
 
 @dataclass
@@ -80,18 +218,42 @@ class OctokitWrapper:
     rest: RestClient
     graphql: GraphQLClient
     session: aiohttp.ClientSession
-    
+    owns_session: bool = True
+
     async def close(self):
-        """Close the session."""
-        await self.session.close()
+        """Close the session, unless it is the shared one."""
+        if self.owns_session:
+            await self.session.close()
+
+
+def create_octokit(
+    token: str,
+    session: Optional[aiohttp.ClientSession] = None,
+    cache: Optional[ResponseCache] = None,
+) -> OctokitWrapper:
+    """
+    Create Octokit-like client wrapper.
 
+    Uses the shared session unless one is given; the shared session is
+    closed by ``close_shared_session()`` rather than by ``close()``. GET
+    responses are cached in ``cache``, or in CLAUDE_GITHUB_API_CACHE_DIR if set.
+    Requests of all clients are scheduled by the shared rate limiter, REST
+    GETs follow the retry policy from the environment, and concurrent
+    GraphQL queries are batched into one request.
+    """
+    owns_session = session is not None
+    session = session or get_shared_session()
+    limiter = get_shared_rate_limiter()
 
-def create_octokit(token: str) -> OctokitWrapper:
-    """Create Octokit-like client wrapper."""
-    session = aiohttp.ClientSession()
-    
     return OctokitWrapper(
-        rest=RestClient(session=session, token=token),
-        graphql=GraphQLClient(session=session, token=token),
-        session=session
-    )
\ No newline at end of file
+        rest=RestClient(
+            session=session,
+            token=token,
+            cache=cache or ResponseCache.from_environment(),
+            limiter=limiter,
+            policy=RetryPolicy.from_environment(),
+        ),
+        graphql=GraphQLClient(session=session, token=token, limiter=limiter, batching=True),
+        session=session,
+        owns_session=owns_session,
+    )
@@ -0,0 +1,282 @@
+"""Dataloader-style batching of GraphQL queries into aliased documents."""
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Upper bound on queries merged into one document, to keep its cost and
+# complexity well inside GitHub's limits
+MAX_BATCH_SIZE = 20
+
+RATE_LIMIT_SELECTION = "rateLimit { cost remaining limit resetAt }"
+
+NAME = re.compile(r"[_A-Za-z][_0-9A-Za-z]*")
+STRING = re.compile(r'"(?:\\.|[^"\\])*"')
+VARIABLE = re.compile(r"\$([_A-Za-z][_0-9A-Za-z]*)")
+OPERATION = re.compile(r"\s*(?:query\b\s*(?:[_A-Za-z][_0-9A-Za-z]*)?\s*)?")
+COMMENT = re.compile(r'"(?:\\.|[^"\\])*"|#[^\n]*')
+
+
+class UnbatchableQuery(ValueError):
+    """The query uses syntax the batcher does not rewrite."""
+
+
+@dataclass
+class ParsedQuery:
+    """A single query operation split into the parts that get merged."""
+    variable_definitions: str
+    # (response key, field text without alias) of each top-level field
+    fields: List[Tuple[str, str]]
+
+
+def _skip_balanced(text: str, pos: int, opening: str, closing: str) -> int:
+    """Return the index after the bracket that closes the one at ``pos``."""
+    depth = 0
+    while pos < len(text):
+        char = text[pos]
+        if char == '"':
+            match = STRING.match(text, pos)
+            if match is None:
+                raise UnbatchableQuery("unterminated string")
+            pos = match.end()
+            continue
+        if char == opening:
+            depth += 1
+        elif char == closing:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise UnbatchableQuery(f"unbalanced {opening}{closing}")
+
+
+def _skip_ignored(text: str, pos: int) -> int:
+    while pos < len(text) and (text[pos].isspace() or text[pos] == ","):
+        pos += 1
+    return pos
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Split a query operation into variable definitions and top-level fields.
+
+    Only plain ``query`` operations (or the ``{ ... }`` shorthand) without
+    fragments or block strings are supported; anything else raises
+    ``UnbatchableQuery`` and is sent on its own.
+    """
+    if '"""' in query:
+        raise UnbatchableQuery("block strings")
+    # Drop comments, keeping strings intact
+    text = COMMENT.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "", query)
+
+    pos = OPERATION.match(text).end()
+    variable_definitions = ""
+    if pos < len(text) and text[pos] == "(":
+        end = _skip_balanced(text, pos, "(", ")")
+        variable_definitions = text[pos + 1:end - 1].strip()
+        pos = _skip_ignored(text, end)
+    if pos >= len(text) or text[pos] != "{":
+        raise UnbatchableQuery("not a query operation")
+
+    end = _skip_balanced(text, pos, "{", "}")
+    if text[end:].strip():
+        raise UnbatchableQuery("multiple definitions or fragments")
+
+    fields = []
+    pos = _skip_ignored(text, pos + 1)
+    while text[pos] != "}":
+        if text.startswith("...", pos):
+            raise UnbatchableQuery("top-level fragment spread")
+        match = NAME.match(text, pos)
+        if match is None:
+            raise UnbatchableQuery(f"unexpected {text[pos]!r}")
+        key = match.group(0)
+        pos = _skip_ignored(text, match.end())
+        if text[pos] == ":":
+            match = NAME.match(text, _skip_ignored(text, pos + 1))
+            if match is None:
+                raise UnbatchableQuery("alias without field")
+            pos = match.end()
+        field_start = match.start()
+
+        pos = _skip_ignored(text, pos)
+        if text[pos] == "(":
+            pos = _skip_balanced(text, pos, "(", ")")
+        pos = _skip_ignored(text, pos)
+        while text[pos] == "@":
+            directive = NAME.match(text, pos + 1)
+            if directive is None:
+                raise UnbatchableQuery("bad directive")
+            pos = _skip_ignored(text, directive.end())
+            if text[pos] == "(":
+                pos = _skip_balanced(text, pos, "(", ")")
+            pos = _skip_ignored(text, pos)
+        if text[pos] == "{":
+            pos = _skip_balanced(text, pos, "{", "}")
+
+        fields.append((key, text[field_start:pos].strip()))
+        pos = _skip_ignored(text, pos)
+
+    if not fields:
+        raise UnbatchableQuery("empty selection")
+    return ParsedQuery(variable_definitions, fields)
+
+
+def _rename_variables(text: str, prefix: str) -> str:
+    """Prefix every ``$variable`` outside string literals."""
+    parts = []
+    last = 0
+    for match in STRING.finditer(text):
+        parts.append(VARIABLE.sub(lambda m: f"${prefix}{m.group(1)}", text[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(VARIABLE.sub(lambda m: f"${prefix}{m.group(1)}", text[last:]))
+    return "".join(parts)
+
+
+def merge_queries(
+    queries: List[Tuple[ParsedQuery, Optional[Dict[str, Any]]]],
+) -> Tuple[str, Dict[str, Any]]:
+    """Build one aliased document (and its variables) from parsed queries."""
+    definitions = []
+    selections = []
+    variables: Dict[str, Any] = {}
+    for index, (parsed, query_variables) in enumerate(queries):
+        prefix = f"q{index}_"
+        if parsed.variable_definitions:
+            definitions.append(_rename_variables(parsed.variable_definitions, prefix))
+        for key, field in parsed.fields:
+            selections.append(f"{prefix}{key}: {_rename_variables(field, prefix)}")
+        for name, value in (query_variables or {}).items():
+            variables[f"{prefix}{name}"] = value
+
+    header = f"query BatchedQuery({', '.join(definitions)})" if definitions else "query BatchedQuery"
+    body = "\n  ".join(selections + [RATE_LIMIT_SELECTION])
+    return f"{header} {{\n  {body}\n}}", variables
+
+
+def _query_index(key: str, count: int) -> Tuple[Optional[int], str]:
+    """Map an aliased ``q<N>_<key>`` response key to the query and its own key."""
+    index, _, original = key.partition("_")
+    if index.startswith("q") and index[1:].isdigit() and int(index[1:]) < count:
+        return int(index[1:]), original
+    return None, key
+
+
+def split_result(result: Dict[str, Any], count: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Split a merged response back into one response per query.
+
+    Returns None when the response can't be attributed query by query: the
+    document was rejected as a whole (``data`` is null, e.g. a validation
+    error or a node or cost limit) or an error has no aliased path. With a
+    single query, such errors are its own.
+    """
+    data = result.get("data")
+    if data is None and count > 1:
+        return None
+    responses: List[Dict[str, Any]] = [{"data": {} if data is not None else None} for _ in range(count)]
+
+    for key, value in (data or {}).items():
+        index, original = _query_index(key, count)
+        if index is not None:
+            responses[index]["data"][original] = value
+
+    for error in result.get("errors") or []:
+        path = error.get("path") or []
+        index, original = _query_index(path[0], count) if path and isinstance(path[0], str) else (None, "")
+        if index is not None:
+            responses[index].setdefault("errors", []).append({**error, "path": [original] + path[1:]})
+        elif count == 1:
+            responses[0].setdefault("errors", []).append(error)
+        else:
+            return None
+    return responses
+
+
+class GraphQLBatcher:
+    """
+    Merge queries issued in the same event-loop tick into one request.
+
+    Each caller's top-level fields are aliased with a ``q<N>_`` prefix and
+    its variables renamed the same way; the response is split back so every
+    caller gets the result its own query would have returned. The merged
+    document also selects ``rateLimit`` to report the combined cost. When
+    the merged response can't be split (GitHub rejected the whole document),
+    every query is sent again on its own, so one bad query doesn't fail
+    the others.
+    """
+
+    def __init__(self, send: Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]):
+        self.send = send
+        self.batches = 0
+        self.batched_queries = 0
+        self.total_cost = 0
+        self.fallbacks = 0
+        self._queue: List[Tuple[str, ParsedQuery, Optional[Dict[str, Any]], "asyncio.Future[Dict[str, Any]]"]] = []
+        self._flush_scheduled = False
+
+    async def load(self, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Queue a query for the next batch and wait for its own result."""
+        try:
+            parsed = parse_query(query)
+        except UnbatchableQuery:
+            return await self.send(query, variables)
+
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[Dict[str, Any]]" = loop.create_future()
+        self._queue.append((query, parsed, variables, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            # Runs after every task that is ready in this tick had its turn
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        queue, self._queue = self._queue, []
+        for start in range(0, len(queue), MAX_BATCH_SIZE):
+            asyncio.ensure_future(self._dispatch(queue[start:start + MAX_BATCH_SIZE]))
+
+    async def _send_alone(
+        self, query: str, variables: Optional[Dict[str, Any]], future: "asyncio.Future[Dict[str, Any]]"
+    ) -> None:
+        try:
+            result = await self.send(query, variables)
+        except BaseException as error:
+            if not future.done():
+                future.set_exception(error)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _dispatch(self, batch: List[Tuple[str, ParsedQuery, Optional[Dict[str, Any]], "asyncio.Future[Dict[str, Any]]"]]) -> None:
+        document, variables = merge_queries([(parsed, query_variables) for _, parsed, query_variables, _ in batch])
+        try:
+            result = await self.send(document, variables or None)
+        except BaseException as error:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        responses = split_result(result, len(batch))
+        if responses is None:
+            self.fallbacks += 1
+            print(f"GraphQL: merged request of {len(batch)} queries was rejected, sending them one by one")
+            await asyncio.gather(*(
+                self._send_alone(query, query_variables, future) for query, _, query_variables, future in batch
+            ))
+            return
+
+        cost = ((result.get("data") or {}).get("rateLimit") or {}).get("cost") or 0
+        self.batches += 1
+        self.batched_queries += len(batch)
+        self.total_cost += int(cost)
+        if len(batch) > 1:
+            print(f"GraphQL: merged {len(batch)} queries into one request (cost {cost})")
+
+        for (_, _, _, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
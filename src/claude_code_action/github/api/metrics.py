@@ -0,0 +1,221 @@
+"""Per-endpoint request metrics for the GitHub API clients."""
+
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional
+from urllib.parse import urlparse
+
+# Upper bounds of the latency histogram buckets, in milliseconds; the last
+# bucket holds everything slower
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Endpoints listed in the step summary, slowest in total first
+SUMMARY_ENDPOINTS = 15
+
+# Path segments following these name a user, owner or repository
+NAMED_SEGMENTS = {
+    "repos": ("{owner}", "{repo}"),
+    "users": ("{username}",),
+    "orgs": ("{org}",),
+    "collaborators": ("{username}",),
+    "installations": ("{installation_id}",),
+    "branches": ("{branch}",),
+}
+ID_SEGMENT = re.compile(r"^\d+$")
+SHA_SEGMENT = re.compile(r"^[0-9a-f]{40}$")
+
+
+@lru_cache(maxsize=1024)
+def endpoint_template(method: str, url: str) -> str:
+    """
+    Normalize a request to its endpoint, e.g.
+    ``GET /repos/{owner}/{repo}/issues/{id}/comments``.
+    """
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    template: List[str] = []
+    index = 0
+    while index < len(segments):
+        segment = segments[index]
+        index += 1
+        if ID_SEGMENT.match(segment):
+            template.append("{id}")
+        elif SHA_SEGMENT.match(segment):
+            template.append("{sha}")
+        else:
+            template.append(segment)
+        for placeholder in NAMED_SEGMENTS.get(segment, ()):
+            if index < len(segments):
+                template.append(placeholder)
+                index += 1
+    return f"{method.upper()} /{'/'.join(template)}"
+
+
+@dataclass
+class EndpointMetrics:
+    """Counts, statuses, bytes and latency histogram of one endpoint."""
+    requests: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+    response_bytes: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    histogram: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given percentile, in milliseconds."""
+        target = fraction * self.requests
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target and count:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(float(LATENCY_BUCKETS_MS[index]), self.max_ms)
+                break
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "response_bytes": self.response_bytes,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": round(self.percentile(0.5), 1),
+            "p95_ms": round(self.percentile(0.95), 1),
+            "histogram_ms": {
+                **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.histogram)},
+                "inf": self.histogram[-1],
+            },
+        }
+
+
+@dataclass
+class Headroom:
+    """Lowest primary rate limit headroom seen for one resource."""
+    limit: Optional[int] = None
+    min_remaining: Optional[int] = None
+
+
+class ApiMetrics:
+    """
+    Aggregate GitHub requests per endpoint template.
+
+    Recording a request costs a cached template lookup and a few counter
+    updates, so it stays on in production.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.headroom: Dict[str, Headroom] = {}
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: Optional[int],
+        response_bytes: int,
+        elapsed_seconds: float,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Record one request; ``status`` is None if it failed without a response."""
+        template = endpoint_template(method, url)
+        endpoint = self.endpoints.get(template)
+        if endpoint is None:
+            endpoint = self.endpoints[template] = EndpointMetrics()
+
+        elapsed_ms = elapsed_seconds * 1000
+        key = str(status) if status is not None else "error"
+        endpoint.requests += 1
+        endpoint.statuses[key] = endpoint.statuses.get(key, 0) + 1
+        endpoint.response_bytes += response_bytes
+        endpoint.total_ms += elapsed_ms
+        endpoint.max_ms = max(endpoint.max_ms, elapsed_ms)
+        endpoint.histogram[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+        if headers is not None and (remaining := headers.get("X-RateLimit-Remaining")) is not None:
+            headroom = self.headroom.setdefault(headers.get("X-RateLimit-Resource") or "core", Headroom())
+            try:
+                value = int(remaining)
+                headroom.min_remaining = value if headroom.min_remaining is None else min(headroom.min_remaining, value)
+                if limit := headers.get("X-RateLimit-Limit"):
+                    headroom.limit = int(limit)
+            except ValueError:
+                pass
+
+    @property
+    def requests(self) -> int:
+        return sum(endpoint.requests for endpoint in self.endpoints.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "endpoints": {template: endpoint.to_dict() for template, endpoint in sorted(self.endpoints.items())},
+            "rate_limit_headroom": {
+                resource: {"limit": headroom.limit, "min_remaining": headroom.min_remaining}
+                for resource, headroom in self.headroom.items()
+            },
+        }
+
+    def render_markdown(self, title: str) -> str:
+        """Short step summary table of the slowest endpoints."""
+        lines = [
+            f"### GitHub API: {title}",
+            "",
+            "| Endpoint | Requests | Statuses | p50 | p95 | Max | KiB |",
+            "| --- | ---: | --- | ---: | ---: | ---: | ---: |",
+        ]
+        ranked = sorted(self.endpoints.items(), key=lambda item: item[1].total_ms, reverse=True)
+        for template, endpoint in ranked[:SUMMARY_ENDPOINTS]:
+            statuses = ", ".join(f"{status}×{count}" for status, count in sorted(endpoint.statuses.items()))
+            lines.append(
+                f"| `{template}` | {endpoint.requests} | {statuses} | {endpoint.percentile(0.5):.0f} ms "
+                f"| {endpoint.percentile(0.95):.0f} ms | {endpoint.max_ms:.0f} ms | {endpoint.response_bytes / 1024:.1f} |"
+            )
+        if len(ranked) > SUMMARY_ENDPOINTS:
+            lines.append(f"| … {len(ranked) - SUMMARY_ENDPOINTS} more endpoints | | | | | | |")
+        if self.headroom:
+            headroom = ", ".join(
+                f"{resource} {value.min_remaining}/{value.limit}" for resource, value in self.headroom.items()
+            )
+            lines.extend(["", f"Lowest rate limit headroom: {headroom}"])
+        return "\n".join(lines) + "\n\n"
+
+
+_metrics = ApiMetrics()
+
+
+def get_api_metrics() -> ApiMetrics:
+    """The metrics recorded by every GitHub client in this process."""
+    return _metrics
+
+
+def write_api_metrics(step: str) -> Optional[str]:
+    """
+    Write the recorded metrics as JSON and add a table to the step summary.
+
+    The JSON goes to ``$RUNNER_TEMP/github-api-metrics-<step>.json``; its
+    path is returned, or None if no request was made.
+    """
+    if not _metrics.endpoints:
+        return None
+
+    directory = os.environ.get("RUNNER_TEMP") or tempfile.gettempdir()
+    path = os.path.join(directory, f"github-api-metrics-{step}.json")
+    try:
+        with open(path, "w") as f:
+            json.dump({"step": step, **_metrics.to_dict()}, f, indent=2)
+    except OSError as e:
+        print(f"::warning::Failed to write GitHub API metrics: {e}")
+        return None
+    print(f"GitHub API metrics for {_metrics.requests} requests written to {path}")
+
+    if step_summary := os.environ.get("GITHUB_STEP_SUMMARY"):
+        try:
+            with open(step_summary, "a") as f:
+                f.write(_metrics.render_markdown(step))
+        except OSError as e:
+            print(f"::warning::Failed to write GitHub API metrics summary: {e}")
+    return path
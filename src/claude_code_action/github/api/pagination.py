@@ -0,0 +1,94 @@
+"""Pagination of GitHub REST list endpoints."""
+
+import asyncio
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Deque, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+if TYPE_CHECKING:
+    from .client import ApiResponse, RestClient
+
+DEFAULT_PER_PAGE = 100
+DEFAULT_PREFETCH_WINDOW = 4
+
+LINK_PATTERN = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+def parse_link_header(value: Optional[str]) -> Dict[str, str]:
+    """Map each ``rel`` of a ``Link`` header to its URL."""
+    return {rel: url for url, rel in LINK_PATTERN.findall(value or "")}
+
+
+def _page_number(url: str) -> Optional[int]:
+    pages = parse_qs(urlparse(url).query).get("page")
+    try:
+        return int(pages[0]) if pages else None
+    except ValueError:
+        return None
+
+
+def _items(data: Any, items_key: Optional[str]) -> List[Any]:
+    if items_key is not None:
+        return (data or {}).get(items_key) or []
+    return data or []
+
+
+async def paginate(
+    rest: "RestClient",
+    endpoint: str,
+    params: Optional[Dict[str, Any]] = None,
+    per_page: int = DEFAULT_PER_PAGE,
+    window: int = DEFAULT_PREFETCH_WINDOW,
+    items_key: Optional[str] = None,
+) -> AsyncIterator[Any]:
+    """
+    Yield every item of a paginated list endpoint, in order.
+
+    The first page's ``Link`` header tells whether the last page number is
+    known. If it is, the remaining pages are fetched concurrently, at most
+    ``window`` at a time, and yielded in order as they arrive. Otherwise
+    ``next`` links are followed one by one. Items are streamed, so
+    long lists are never held in memory whole.
+
+    ``items_key`` selects the list inside object responses such as
+    ``{"total_count": ..., "check_runs": [...]}``.
+    """
+    query = dict(params or {})
+    query["per_page"] = per_page
+
+    def fetch(page: int) -> "asyncio.Task[ApiResponse]":
+        return asyncio.ensure_future(rest.request("GET", endpoint, params={**query, "page": page}))
+
+    first = await rest.request("GET", endpoint, params={**query, "page": 1})
+    for item in _items(first.data, items_key):
+        yield item
+
+    links = parse_link_header(first.headers.get("Link"))
+    last_page = _page_number(links["last"]) if "last" in links else None
+
+    if last_page is not None:
+        pending: Deque["asyncio.Task[ApiResponse]"] = deque()
+        next_page = 2
+        try:
+            while next_page <= last_page or pending:
+                while next_page <= last_page and len(pending) < max(1, window):
+                    pending.append(fetch(next_page))
+                    next_page += 1
+                response = await pending.popleft()
+                for item in _items(response.data, items_key):
+                    yield item
+        finally:
+            # The caller may stop early; don't leave fetches running
+            for task in pending:
+                task.cancel()
+        return
+
+    # Without a last link (e.g. cursor pagination) the page count is
+    # unknown; follow next links one by one
+    next_url = links.get("next")
+    while next_url:
+        response = await rest.request("GET", next_url)
+        for item in _items(response.data, items_key):
+            yield item
+        next_url = parse_link_header(response.headers.get("Link")).get("next")
@@ -0,0 +1,238 @@
+"""Rate-limit-aware scheduling of GitHub API requests."""
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+# GitHub's secondary limits allow roughly 900 REST points per minute per
+# endpoint class; stay well below that by default
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_BURST = 20
+
+# Once this fraction of the primary quota is left, requests are spread
+# evenly over the time remaining until the reset
+DEFAULT_RESERVE_FRACTION = 0.05
+
+# Wait used for a secondary limit without Retry-After, per GitHub's docs
+SECONDARY_LIMIT_WAIT_SECONDS = 60.0
+MAX_RATE_LIMIT_RETRIES = 3
+# Longest single wait; a longer reset fails the request instead
+MAX_WAIT_SECONDS = 900.0
+# Shorter waits are lock hand-offs rather than throttling
+MIN_REPORTED_WAIT_SECONDS = 0.005
+
+
+@dataclass
+class QuotaState:
+    """Primary rate limit of one resource (core, graphql, search, ...)."""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: Optional[float] = None
+
+
+class RateLimiter:
+    """
+    Schedule requests so rate limits slow the client down instead of failing it.
+
+    A token bucket caps the request rate. The primary quota is tracked from
+    ``X-RateLimit-*`` headers and the GraphQL ``rateLimit`` object, and the
+    remaining requests are paced out until the reset once the quota runs
+    low. Secondary limits (``Retry-After`` or a 403/429 with no quota left)
+    pause all requests until they clear.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        reserve_fraction: float = DEFAULT_RESERVE_FRACTION,
+    ):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.reserve_fraction = reserve_fraction
+        self.quotas: Dict[str, QuotaState] = {}
+        self.requests = 0
+        self.graphql_cost = 0
+        self.wait_seconds = 0.0
+        self.waits = 0
+        self.rate_limited_responses = 0
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "RateLimiter":
+        """Limiter configured by CLAUDE_GITHUB_API_MAX_RPS and CLAUDE_GITHUB_API_BURST."""
+        rps = os.environ.get("CLAUDE_GITHUB_API_MAX_RPS")
+        burst = os.environ.get("CLAUDE_GITHUB_API_BURST")
+        try:
+            return cls(
+                requests_per_second=float(rps) if rps else DEFAULT_REQUESTS_PER_SECOND,
+                burst=int(burst) if burst else DEFAULT_BURST,
+            )
+        except ValueError:
+            raise ValueError(f"CLAUDE_GITHUB_API_MAX_RPS and CLAUDE_GITHUB_API_BURST must be numbers, got: {rps}, {burst}")
+
+    def _pacing_delay(self, resource: str) -> float:
+        """Delay that spreads a nearly exhausted quota over the time to reset."""
+        quota = self.quotas.get(resource)
+        if quota is None or quota.remaining is None or quota.reset_at is None:
+            return 0.0
+        until_reset = max(0.0, quota.reset_at - time.time())
+        if quota.remaining <= 0:
+            return until_reset
+        reserve = (quota.limit or 0) * self.reserve_fraction
+        if quota.remaining > reserve:
+            return 0.0
+        return until_reset / quota.remaining
+
+    async def acquire(self, resource: str = "core", cost: int = 1) -> float:
+        """Wait for permission to send a request; return the time waited."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    float(self.burst),
+                    self._tokens + (now - self._refilled_at) * self.requests_per_second,
+                )
+                self._refilled_at = now
+
+                if self._paused_until > now:
+                    delay = self._paused_until - now
+                elif self._tokens < cost:
+                    delay = (cost - self._tokens) / self.requests_per_second
+                else:
+                    self._tokens -= cost
+                    break
+                await asyncio.sleep(delay)
+
+            # Holding the lock while pacing spreads queued requests out too
+            pacing = min(self._pacing_delay(resource), MAX_WAIT_SECONDS)
+            if pacing > 0:
+                await asyncio.sleep(pacing)
+
+            # Count the request against the quota until a response corrects it
+            quota = self.quotas.get(resource)
+            if quota is not None and quota.remaining:
+                quota.remaining = max(0, quota.remaining - cost)
+
+        # Includes time queued behind other waiting requests
+        waited = time.monotonic() - started
+        self.requests += 1
+        if waited >= MIN_REPORTED_WAIT_SECONDS:
+            self.waits += 1
+            self.wait_seconds += waited
+        return waited
+
+    def observe(self, resource: str, headers: Mapping[str, str]) -> None:
+        """Update quota state from a response's rate limit headers."""
+        resource = headers.get("X-RateLimit-Resource") or resource
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        quota = self.quotas.setdefault(resource, QuotaState())
+        try:
+            quota.remaining = int(remaining)
+            if limit := headers.get("X-RateLimit-Limit"):
+                quota.limit = int(limit)
+            if reset := headers.get("X-RateLimit-Reset"):
+                quota.reset_at = float(reset)
+        except ValueError:
+            pass
+
+    def observe_graphql(self, data: Any) -> None:
+        """Record the cost reported by a ``rateLimit { cost remaining resetAt }`` selection."""
+        rate_limit = (data or {}).get("data", {}) if isinstance(data, dict) else {}
+        rate_limit = rate_limit.get("rateLimit") if isinstance(rate_limit, dict) else None
+        if not isinstance(rate_limit, dict):
+            return
+        self.graphql_cost += int(rate_limit.get("cost") or 0)
+        quota = self.quotas.setdefault("graphql", QuotaState())
+        if rate_limit.get("remaining") is not None:
+            quota.remaining = int(rate_limit["remaining"])
+        if rate_limit.get("limit") is not None:
+            quota.limit = int(rate_limit["limit"])
+        if reset_at := rate_limit.get("resetAt"):
+            try:
+                quota.reset_at = datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp()
+            except (AttributeError, ValueError):
+                pass
+
+    def retry_delay(self, status: int, headers: Mapping[str, str], body: str = "") -> Optional[float]:
+        """
+        Return how long to wait before retrying a rate limited response, or
+        None if the response was not rate limited. Also pauses later requests.
+        """
+        if status not in (403, 429):
+            return None
+
+        delay: Optional[float] = None
+        if retry_after := headers.get("Retry-After"):
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = SECONDARY_LIMIT_WAIT_SECONDS
+        elif headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+            try:
+                delay = float(headers["X-RateLimit-Reset"]) - time.time() + 1
+            except ValueError:
+                delay = SECONDARY_LIMIT_WAIT_SECONDS
+        elif "rate limit" in body.lower():
+            delay = SECONDARY_LIMIT_WAIT_SECONDS
+
+        if delay is None:
+            return None
+        delay = max(0.0, delay)
+        self.rate_limited_responses += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + min(delay, MAX_WAIT_SECONDS))
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Limiter metrics for reporting."""
+        return {
+            "requests": self.requests,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "waits": self.waits,
+            "rate_limited_responses": self.rate_limited_responses,
+            "graphql_cost": self.graphql_cost,
+            "remaining": {
+                resource: quota.remaining for resource, quota in self.quotas.items()
+            },
+        }
+
+
+_shared: Optional[Tuple[asyncio.AbstractEventLoop, RateLimiter]] = None
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """
+    The limiter shared by every GitHub client on the running event loop,
+    since they all draw on the same installation's quota.
+    """
+    global _shared
+    loop = asyncio.get_running_loop()
+    if _shared is None or _shared[0] is not loop:
+        _shared = (loop, RateLimiter.from_environment())
+    return _shared[1]
+
+
+def log_rate_limiter_stats() -> None:
+    """Print the shared limiter's metrics, if it handled any requests."""
+    if _shared is None or not _shared[1].requests:
+        return
+    stats = _shared[1].stats()
+    remaining = ", ".join(f"{resource}={value}" for resource, value in stats["remaining"].items())
+    print(
+        f"GitHub API: {stats['requests']} requests, rate limiter waited {stats['wait_seconds']}s "
+        f"in {stats['waits']} waits, {stats['rate_limited_responses']} rate limited responses, "
+        f"GraphQL cost {stats['graphql_cost']}" + (f", remaining {remaining}" if remaining else "")
+    )
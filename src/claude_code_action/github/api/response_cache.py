@@ -0,0 +1,161 @@
+"""On-disk cache of GitHub REST responses revalidated with ETag/Last-Modified."""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ... import json_codec
+
+DEFAULT_MAX_CACHE_MB = 50
+
+# Installation tokens are minted per run; their responses are shared by
+# every run against the same repository
+INSTALLATION_TOKEN_PREFIX = "ghs_"
+
+
+def token_scope(token: str) -> str:
+    """
+    Identify what a token can see without storing the token.
+
+    Conditional requests are still authorized by GitHub, so a cached body is
+    only ever returned after the current token was allowed to revalidate it.
+    """
+    if token.startswith(INSTALLATION_TOKEN_PREFIX):
+        return f"installation:{os.environ.get('GITHUB_REPOSITORY', '')}"
+    return "token:" + hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    """
+    Cache of GET responses keyed by URL and token scope.
+
+    Each entry is one JSON file holding the validators and the body. File
+    modification times record use, so eviction drops the least recently used
+    entries once the directory grows beyond ``max_bytes``. Persist the
+    directory with ``actions/cache`` to share it between runs.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_CACHE_MB * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizes: Optional[Dict[Path, int]] = None
+
+    @classmethod
+    def from_environment(cls) -> Optional["ResponseCache"]:
+        """The cache configured by CLAUDE_GITHUB_API_CACHE_DIR, if any."""
+        directory = os.environ.get("CLAUDE_GITHUB_API_CACHE_DIR")
+        if not directory:
+            return None
+        max_mb = os.environ.get("CLAUDE_GITHUB_API_CACHE_MAX_MB") or DEFAULT_MAX_CACHE_MB
+        try:
+            max_bytes = int(float(max_mb) * 1024 * 1024)
+        except ValueError:
+            raise ValueError(f"CLAUDE_GITHUB_API_CACHE_MAX_MB must be a number, got: {max_mb}")
+        return cls(directory, max_bytes)
+
+    def _path(self, url: str, scope: str) -> Path:
+        key = hashlib.sha256(f"{scope}\n{url}".encode()).hexdigest()
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entry_sizes(self) -> Dict[Path, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    self._sizes[path] = path.stat().st_size
+                except OSError:
+                    pass
+        return self._sizes
+
+    def lookup(self, url: str, scope: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry (validators and body) for a request."""
+        path = self._path(url, scope)
+        try:
+            with open(path, "rb") as f:
+                entry = json_codec.load(f)
+        except (OSError, json_codec.JSONDecodeError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validators to send so an unchanged resource is answered with 304."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url: str, scope: str, entry: Dict[str, Any]) -> Any:
+        """Record a 304 for ``entry`` and return its body."""
+        self.hits += 1
+        try:
+            os.utime(self._path(url, scope))
+        except OSError:
+            pass
+        return entry["body"]
+
+    def store(
+        self,
+        url: str,
+        scope: str,
+        body: Any,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        """Store a 200 response that carries a validator."""
+        self.misses += 1
+        if not etag and not last_modified:
+            return
+
+        path = self._path(url, scope)
+        data = json_codec.dumps_bytes({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": int(time.time()),
+            "body": body,
+        })
+        if len(data) > self.max_bytes:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"::warning::Failed to write GitHub API cache entry: {e}")
+            return
+
+        sizes = self._entry_sizes()
+        sizes[path] = len(data)
+        self._evict()
+
+    def _evict(self) -> None:
+        sizes = self._entry_sizes()
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        def last_used(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        for path in sorted(sizes, key=last_used):
+            if total <= self.max_bytes:
+                break
+            total -= sizes.pop(path)
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,157 @@
+"""Deadlines, retries and hedging for idempotent GitHub requests."""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import aiohttp
+
+T = TypeVar("T")
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+DEFAULT_DEADLINE_SECONDS = 15.0
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+# Latencies kept for the hedging threshold, and how many are needed
+# before it is trusted
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+MIN_HEDGE_DELAY_SECONDS = 0.05
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed idempotent request may succeed when sent again."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    # Connection resets, refused connections, truncated bodies and deadlines
+    return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The given percentile, or None until enough samples were seen."""
+        if len(self._samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class RetryPolicy:
+    """
+    Make idempotent requests robust against stuck and failed connections.
+
+    Every attempt gets a deadline. Attempts that time out, lose their
+    connection or get a 5xx are retried after a jittered exponential backoff.
+    With hedging enabled, a duplicate is sent once an attempt has been
+    outstanding longer than the observed p95 latency, and whichever answers
+    first wins. Only use it for methods in ``IDEMPOTENT_METHODS``: a POST
+    that timed out may still have been applied.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        hedging: bool = False,
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.hedging = hedging
+        self.latency = LatencyTracker()
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @classmethod
+    def from_environment(cls) -> "RetryPolicy":
+        """Policy configured by CLAUDE_GITHUB_API_DEADLINE_SECONDS, CLAUDE_GITHUB_API_MAX_RETRIES and CLAUDE_GITHUB_API_HEDGE."""
+        deadline = os.environ.get("CLAUDE_GITHUB_API_DEADLINE_SECONDS")
+        retries = os.environ.get("CLAUDE_GITHUB_API_MAX_RETRIES")
+        try:
+            return cls(
+                deadline_seconds=float(deadline) if deadline else DEFAULT_DEADLINE_SECONDS,
+                max_retries=int(retries) if retries else DEFAULT_MAX_RETRIES,
+                hedging=os.environ.get("CLAUDE_GITHUB_API_HEDGE", "false").lower() == "true",
+            )
+        except ValueError:
+            raise ValueError(
+                f"CLAUDE_GITHUB_API_DEADLINE_SECONDS and CLAUDE_GITHUB_API_MAX_RETRIES must be numbers, got: {deadline}, {retries}"
+            )
+
+    def timeout(self) -> aiohttp.ClientTimeout:
+        """Per-attempt timeout, covering connecting, the response and its body."""
+        return aiohttp.ClientTimeout(total=self.deadline_seconds)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt + 1``."""
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedging:
+            return None
+        p95 = self.latency.percentile(0.95)
+        return max(p95, MIN_HEDGE_DELAY_SECONDS) if p95 is not None else None
+
+    async def _hedged(self, send: Callable[[], Awaitable[T]], delay: float) -> T:
+        tasks = [asyncio.ensure_future(send())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+
+            self.hedges += 1
+            tasks.append(asyncio.ensure_future(send()))
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run(self, send: Callable[[], Awaitable[T]], description: str) -> T:
+        """Call ``send`` until it succeeds, retries run out or the error is final."""
+        for attempt in range(self.max_retries + 1):
+            started = time.monotonic()
+            try:
+                delay = self.hedge_delay()
+                result = await (self._hedged(send, delay) if delay is not None else send())
+            except Exception as error:
+                if attempt >= self.max_retries or not is_retryable(error):
+                    raise
+                backoff = self.backoff(attempt)
+                reason = f"HTTP {error.status}" if isinstance(error, aiohttp.ClientResponseError) else type(error).__name__
+                print(f"GitHub API request failed ({description}: {reason}), retrying in {backoff:.1f}s")
+                self.retries += 1
+                await asyncio.sleep(backoff)
+                continue
+            self.latency.record(time.monotonic() - started)
+            return result
+
+        raise RuntimeError("unreachable")
+
+    def stats(self) -> Dict[str, int]:
+        """Retry and hedging counts for reporting."""
+        return {"retries": self.retries, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
@@ -0,0 +1,102 @@
+"""Shared, tuned HTTP session for all GitHub traffic."""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import aiohttp
+
+from ... import json_codec
+from .cassette import cassette_from_environment
+
+
+@dataclass
+class HttpSettings:
+    """Connection pool and timeout settings for GitHub HTTP traffic."""
+    # Total open connections, and open connections per host
+    connection_limit: int = 32
+    connection_limit_per_host: int = 8
+    # How long idle connections are kept for reuse
+    keepalive_seconds: float = 30.0
+    dns_cache_seconds: int = 300
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    total_timeout: float = 60.0
+    # Ask for gzip/deflate encoded responses
+    compression: bool = True
+
+    @classmethod
+    def from_environment(cls) -> "HttpSettings":
+        """Build settings, overriding defaults from CLAUDE_GITHUB_HTTP_* variables."""
+        settings = cls()
+        for name, env_name, convert in (
+            ("connection_limit", "CLAUDE_GITHUB_HTTP_MAX_CONNECTIONS", int),
+            ("connection_limit_per_host", "CLAUDE_GITHUB_HTTP_MAX_CONNECTIONS_PER_HOST", int),
+            ("keepalive_seconds", "CLAUDE_GITHUB_HTTP_KEEPALIVE_SECONDS", float),
+            ("dns_cache_seconds", "CLAUDE_GITHUB_HTTP_DNS_CACHE_SECONDS", int),
+            ("connect_timeout", "CLAUDE_GITHUB_HTTP_CONNECT_TIMEOUT", float),
+            ("read_timeout", "CLAUDE_GITHUB_HTTP_READ_TIMEOUT", float),
+            ("total_timeout", "CLAUDE_GITHUB_HTTP_TIMEOUT", float),
+        ):
+            raw = os.environ.get(env_name)
+            if raw:
+                try:
+                    setattr(settings, name, convert(raw))
+                except ValueError:
+                    raise ValueError(f"{env_name} must be a number, got: {raw}")
+        if compression := os.environ.get("CLAUDE_GITHUB_HTTP_COMPRESSION"):
+            settings.compression = compression.lower() != "false"
+        return settings
+
+
+def create_session(settings: Optional[HttpSettings] = None) -> aiohttp.ClientSession:
+    """Create a session with a keep-alive connection pool and DNS cache."""
+    settings = settings or HttpSettings.from_environment()
+    connector = aiohttp.TCPConnector(
+        limit=settings.connection_limit,
+        limit_per_host=settings.connection_limit_per_host,
+        keepalive_timeout=settings.keepalive_seconds,
+        use_dns_cache=True,
+        ttl_dns_cache=settings.dns_cache_seconds,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.total_timeout,
+        connect=settings.connect_timeout,
+        sock_read=settings.read_timeout,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"Accept-Encoding": "gzip, deflate" if settings.compression else "identity"},
+        auto_decompress=True,
+        json_serialize=json_codec.dumps,
+    )
+
+
+_shared: Optional[Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = None
+
+
+def get_shared_session() -> aiohttp.ClientSession:
+    """
+    The session shared by every GitHub client on the running event loop.
+
+    Token exchange, the REST and GraphQL clients and progress updates all
+    reuse its warm connections instead of each paying for a TLS handshake.
+    With CLAUDE_GITHUB_API_CASSETTE set, it records or replays all of that traffic
+    instead; see ``cassette.cassette_from_environment``.
+    """
+    global _shared
+    loop = asyncio.get_running_loop()
+    if _shared is None or _shared[0] is not loop or _shared[1].closed:
+        _shared = (loop, cassette_from_environment(create_session) or create_session())
+    return _shared[1]
+
+
+async def close_shared_session() -> None:
+    """Close the shared session, if one is open on the running event loop."""
+    global _shared
+    if _shared is not None and _shared[0] is asyncio.get_running_loop():
+        session = _shared[1]
+        _shared = None
+        await session.close()
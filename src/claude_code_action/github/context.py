@@ -1,11 +1,12 @@
 """GitHub context parsing functionality."""
 
 import os
-import json
 from typing import Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from .. import json_codec
+
 
 class EventName(str, Enum):
     """GitHub event names."""
@@ -68,8 +69,8 @@ def parse_github_context() -> ParsedGitHubContext:
     if not github_event_path:
         raise Exception("GITHUB_EVENT_PATH not found")
     
-    with open(github_event_path, 'r') as f:
-        payload = json.load(f)
+    with open(github_event_path, 'rb') as f:
+        payload = json_codec.load(f)
     
     event_name = os.environ.get("GITHUB_EVENT_NAME")
     if not event_name:
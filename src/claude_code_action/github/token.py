@@ -4,9 +4,10 @@ import os
 import time
 import json
 from typing import Optional
-import aiohttp
 import asyncio
 
+from .api.session import get_shared_session
+
 
 class TokenError(Exception):
     """Token-related errors."""
@@ -34,46 +35,48 @@ async def get_oidc_token(max_retries: int = 5) -> str:
     if not request_url or not request_token:
         raise TokenError("OIDC token request URL or token not available")
     
+    # Retries reuse the pooled connections of the shared session
+    session = get_shared_session()
+    
     for attempt in range(max_retries):
         try:
             # Request ID token
-            async with aiohttp.ClientSession() as session:
-                headers = {"Authorization": f"Bearer {request_token}"}
-                params = {"audience": "github"}
-                
-                async with session.get(request_url, headers=headers, params=params) as response:
-                    if response.status != 200:
-                        raise TokenError(f"Failed to get ID token: {response.status}")
-                    
-                    data = await response.json()
-                    id_token = data.get("value")
-                    
-                    if not id_token:
-                        raise TokenError("No ID token in response")
+            headers = {"Authorization": f"Bearer {request_token}"}
+            params = {"audience": "github"}
+            
+            async with session.get(request_url, headers=headers, params=params) as response:
+                if response.status != 200:
+                    raise TokenError(f"Failed to get ID token: {response.status}")
                 
-                # Exchange ID token for installation access token
-                github_api_url = os.environ.get("GITHUB_API_URL", "https://api.github.com")
-                token_url = f"{github_api_url}/app/installations/{os.environ.get('GITHUB_INSTALLATION_ID')}/access_tokens"
+                data = await response.json()
+                id_token = data.get("value")
                 
-                headers = {
-                    "Authorization": f"Bearer {id_token}",
-                    "Accept": "application/vnd.github+json",
-                    "X-GitHub-Api-Version": "2022-11-28"
-                }
+                if not id_token:
+                    raise TokenError("No ID token in response")
+            
+            # Exchange ID token for installation access token
+            github_api_url = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+            token_url = f"{github_api_url}/app/installations/{os.environ.get('GITHUB_INSTALLATION_ID')}/access_tokens"
+            
+            headers = {
+                "Authorization": f"Bearer {id_token}",
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28"
+            }
+            
+            async with session.post(token_url, headers=headers) as response:
+                if response.status == 201:
+                    data = await response.json()
+                    access_token = data.get("token")
+                    if access_token:
+                        # Set output for token revocation
+                        if github_output := os.environ.get("GITHUB_OUTPUT"):
+                            with open(github_output, "a") as f:
+                                f.write(f"GITHUB_TOKEN={access_token}\n")
+                        return access_token
                 
-                async with session.post(token_url, headers=headers) as response:
-                    if response.status == 201:
-                        data = await response.json()
-                        access_token = data.get("token")
-                        if access_token:
-                            # Set output for token revocation
-                            if github_output := os.environ.get("GITHUB_OUTPUT"):
-                                with open(github_output, "a") as f:
-                                    f.write(f"GITHUB_TOKEN={access_token}\n")
-                            return access_token
-                    
-                    raise TokenError(f"Failed to get access token: {response.status}")
-        
+                raise TokenError(f"Failed to get access token: {response.status}")
+
         except Exception as e:
             if attempt == max_retries - 1:
                 raise e
@@ -0,0 +1,89 @@
+"""JSON encoding and decoding with an optional fast backend."""
+
+import json
+import os
+from typing import IO, Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Raised by every backend for malformed input
+JSONDecodeError = json.JSONDecodeError
+
+
+class StdlibCodec:
+    """The standard library ``json`` module."""
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        return self.dumps(obj, indent).encode("utf-8")
+
+
+class OrjsonCodec(StdlibCodec):
+    """
+    ``orjson``, several times faster on large documents.
+
+    It is stricter than the stdlib: NaN, non-string keys and integers beyond
+    64 bits are rejected. Such values are rare in GitHub and stream-json
+    payloads, so they fall back to the stdlib instead of failing. Output is
+    compact (no spaces after separators).
+    """
+
+    name = "orjson"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Raises the stdlib error for invalid input, or accepts NaN etc.
+            return json.loads(data)
+
+    def dumps(self, obj: Any, indent: bool = False) -> str:
+        return self.dumps_bytes(obj, indent).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+CODECS: Dict[str, type] = {"json": StdlibCodec, "orjson": OrjsonCodec}
+
+
+def get_codec(name: Optional[str] = None) -> StdlibCodec:
+    """
+    Return the named codec, or the fastest one installed.
+
+    CLAUDE_JSON_BACKEND (``json`` or ``orjson``) overrides the choice.
+    """
+    name = name or os.environ.get("CLAUDE_JSON_BACKEND") or ("orjson" if orjson is not None else "json")
+    if name not in CODECS:
+        raise ValueError(f"CLAUDE_JSON_BACKEND must be one of {', '.join(CODECS)}, got: {name}")
+    if name == "orjson" and orjson is None:
+        print("::warning::The orjson JSON backend requires the 'orjson' package, using json")
+        name = "json"
+    return CODECS[name]()
+
+
+codec = get_codec()
+BACKEND = codec.name
+
+# Module-level shortcuts bound to the selected codec
+loads = codec.loads
+dumps = codec.dumps
+dumps_bytes = codec.dumps_bytes
+
+
+def load(f: IO) -> Any:
+    """Decode a JSON file opened in text or binary mode."""
+    return loads(f.read())